@@ -9,8 +9,15 @@ https://docs.djangoproject.com/en/4.1/howto/deployment/asgi/
 
 import os
 
-from django.core.asgi import get_asgi_application
+import django
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'ambition.settings')
+# ASGI 서버에서는 API 를 비동기 View 로 제공한다. (settings.STORE_ASYNC_API)
+os.environ.setdefault('STORE_ASYNC_API', 'true')
 
-application = get_asgi_application()
+django.setup(set_prefix=False)
+
+# 주문 실시간 알림(AsyncStreamingHttpResponse)을 이벤트 루프에서 보내도록 store 의 핸들러를 사용한다.
+from store.asgi import ASGIHandler
+
+application = ASGIHandler()
@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/4.1/ref/settings/
 """
 
 import json
+import os
 from pathlib import Path
 
 import pymysql
@@ -56,11 +57,16 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'store.middleware.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'store.middleware.PrecompressedStaticMiddleware',
+    'store.middleware.ApiGZipMiddleware',
+    'store.middleware.QueryAccountingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'store.middleware.CurrentUserMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -85,6 +91,11 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'ambition.wsgi.application'
 
+ASGI_APPLICATION = 'ambition.asgi.application'
+
+# API 를 비동기 View 로 제공할지 여부. ambition/asgi.py 로 구동하면 켜진다.
+STORE_ASYNC_API = os.environ.get('STORE_ASYNC_API', 'false') == 'true'
+
 
 # Database
 # https://docs.djangoproject.com/en/4.1/ref/settings/#databases
@@ -102,6 +113,33 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/4.1/topics/cache/
+# 여러 프로세스로 서비스할 때에는 메뉴 캐시가 공유되도록 secrets.json 에 공유 캐시(Memcached, Redis 등)를 설정한다.
+
+CACHES = secrets.get('CACHES', {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+})
+
+# 프로세스 메모리에 둔 데이터(주문 상태, 카테고리)를 다시 불러오는 최대 주기(초).
+# CACHES 가 프로세스 메모리(LocMemCache)라면 다른 프로세스의 변경이 전달되지 않으므로,
+# 메뉴 캐시와 상품 검색 색인도 이 주기마다 다시 만든다. (python manage.py check --deploy 가 경고한다)
+STORE_PROCESS_CACHE_MAX_AGE = 60
+
+
+# Sessions
+# https://docs.djangoproject.com/en/3.2/topics/http/sessions/#configuring-the-session-engine
+# 기본값(cached_db)은 세션을 캐시에서 읽고, 세션이 바뀔 때(로그인, 로그아웃)에만 데이터베이스에 쓴다.
+# 프로세스가 여러 개라면 로그아웃이 모든 프로세스에 반영되도록 CACHES 에 공유 캐시를 설정해야 한다.
+# 'django.contrib.sessions.backends.signed_cookies' 는 서버에 아무것도 저장하지 않지만,
+# 로그아웃하기 전에 복사된 쿠키는 SESSION_COOKIE_AGE 동안 계속 사용할 수 있다.
+# 데이터베이스를 사용하는 저장소는 python manage.py clearsessions 를 주기적으로 실행하여 만료된 세션을 삭제한다.
+
+SESSION_ENGINE = secrets.get('SESSION_ENGINE', 'django.contrib.sessions.backends.cached_db')
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.1/ref/settings/#auth-password-validators
 
@@ -138,6 +176,14 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+# collectstatic 은 파일 이름에 해시를 붙이고 .gz, .br(brotli 패키지가 있을 때) 압축본을 함께 만든다.
+# 만들어진 파일은 store.middleware.PrecompressedStaticMiddleware 가 제공한다.
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+STATICFILES_STORAGE = 'store.storage.CompressedManifestStaticFilesStorage'
+
+# 해시가 붙지 않은 정적 파일의 캐시 시간(초)
+STORE_STATIC_MAX_AGE = 60
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.1/ref/settings/#default-auto-field
 
@@ -149,4 +195,66 @@ EMAIL_PORT = 587
 EMAIL_HOST_USER = secrets['EMAIL_HOST_USER']
 EMAIL_HOST_PASSWORD = secrets['EMAIL_HOST_PASSWORD']
 EMAIL_USE_TLS = True
-DEFAULT_FROM_EMAIL = EMAIL_HOST_USER
\ No newline at end of file
+DEFAULT_FROM_EMAIL = EMAIL_HOST_USER
+
+# 이메일 인증 코드의 유효 시간(초). 만료된 코드는 sweep_email_validations 명령으로 정리한다.
+STORE_EMAIL_VALIDATION_TTL = 60 * 10
+
+# 인증 메일 발송 큐 (store.mail.MailQueue)
+STORE_MAIL_QUEUE = {
+    'WORKERS': 2,
+    'BATCH_SIZE': 20,
+    'MAX_RETRIES': 3,
+    'BACKOFF': 1.0,
+    'IDLE_TIMEOUT': 30.0,
+}
+
+# 매출 집계에서 제외할 주문 상태(OrderStatus)의 pk 목록 (예: 주문 취소)
+STORE_SALES_EXCLUDED_STATUSES = []
+
+# 주문 상태 변경 표. {상태 pk: [이 상태로 변경할 수 있는 이전 상태 pk 목록]}
+# 기본값은 seed_store 의 상태(1 주문 접수, 2 조리 중, 3 조리 완료, 4 주문 취소)를 기준으로 한다.
+STORE_ORDER_TRANSITIONS = {
+    1: [],
+    2: [1],
+    3: [1, 2],
+    4: [1, 2],
+}
+
+# 요청과 응답에 사용할 JSON 코덱 (store.codec). 'auto' 는 orjson 이 설치되어 있다면 orjson 을 사용한다.
+STORE_JSON_CODEC = 'auto'
+
+# 요청 별 쿼리 측정 (store.middleware.QueryAccountingMiddleware)
+# 운영 환경에서는 일부 요청만 측정하며, 개발 중에 모든 요청을 측정하려면 SAMPLE_RATE 를 1.0 으로 올린다.
+# MAX_QUERIES 는 주문 생성(약 12개)보다 여유 있게 두고, ROUTES 에 URL 패턴 별 한도를 둔다. (None 은 한도 없음)
+STORE_QUERY_ACCOUNTING = {
+    'SAMPLE_RATE': 0.05,
+    'MAX_QUERIES': 25,
+    'MAX_DURATION_MS': 500,
+    'ROUTES': {
+        # 이벤트가 생길 때까지 기다리는 롱 폴링
+        'api/v1/order/events': {'MAX_DURATION_MS': None},
+        # 행 수에 비례하여 쿼리와 시간이 늘어나는 일괄 추가
+        'api/v1/product/bulk': {'MAX_QUERIES': None, 'MAX_DURATION_MS': None},
+    },
+}
+
+# API 응답 압축 (store.middleware.ApiGZipMiddleware). MIN_SIZE 바이트보다 작은 응답은 압축하지 않는다.
+STORE_API_COMPRESSION = {
+    'ENABLED': True,
+    'MIN_SIZE': 1024,
+}
+
+# 요청 횟수 제한 (store.ratelimit). BACKEND 가 'cache' 이면 CACHES 를 통해 여러 프로세스가 한도를 공유한다.
+# PROXY_COUNT 는 앞단의 프록시 수이며, 0 이 아니면 X-Forwarded-For 에서 클라이언트 IP 를 읽는다.
+STORE_RATE_LIMIT = {
+    'ENABLED': True,
+    'BACKEND': 'local',
+    'PROXY_COUNT': 0,
+}
+
+# 메트릭 (store.metrics). 여러 프로세스로 구동할 때에는 모든 프로세스가 공유하는 디렉토리를 지정하면
+# /metrics 가 모든 프로세스의 값을 합산하여 반환한다. 디렉토리는 배포할 때마다 비운다.
+STORE_METRICS_DIR = secrets.get('STORE_METRICS_DIR')
+# /metrics 를 요청할 수 있는 주소 또는 CIDR 대역. 클라이언트 주소는 STORE_RATE_LIMIT 의 PROXY_COUNT 를 따른다.
+STORE_METRICS_ALLOWED_IPS = secrets.get('STORE_METRICS_ALLOWED_IPS', ['127.0.0.1', '::1'])
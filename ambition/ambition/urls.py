@@ -13,6 +13,7 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path
 from django.views.decorators.csrf import csrf_exempt
@@ -20,17 +21,38 @@ from django.views.generic import TemplateView
 
 from store.views import *
 
+
+def api_view(view_class):
+    """ASGI 로 구동할 때(settings.STORE_ASYNC_API)에는 API View 를 비동기 View 로 제공한다."""
+    if settings.STORE_ASYNC_API:
+        return async_api_view(view_class)
+    return csrf_exempt(view_class.as_view())
+
+
+def order_event_view():
+    """ASGI 로 구동할 때에는 스레드를 붙잡지 않는 비동기 View 로 주문 실시간 알림을 제공한다."""
+    if settings.STORE_ASYNC_API:
+        return async_order_event_view
+    return csrf_exempt(OrderEventView.as_view())
+
+
 urlpatterns = [
     path('admin/', admin.site.urls),
-    path('api/v1/email/validation', csrf_exempt(EmailValidationView.as_view())),
-    path('api/v1/signup', csrf_exempt(UserCreateView.as_view())),
-    path('api/v1/login', csrf_exempt(UserLoginView.as_view())),
-    path('api/v1/logout', csrf_exempt(UserLogoutView.as_view())),
-    path('api/v1/order', csrf_exempt(OrderView.as_view())),
-    path('api/v1/order/<int:order_id>', csrf_exempt(OrderIdView.as_view())),
-    path('api/v1/product', csrf_exempt(ProductView.as_view())),
-    path('api/v1/product/<int:product_id>', csrf_exempt(ProductIdView.as_view())),
-    path('api/v1/category', csrf_exempt(CategoryView.as_view())),
+    path('api/v1/email/validation', api_view(EmailValidationView)),
+    path('api/v1/signup', api_view(UserCreateView)),
+    path('api/v1/login', api_view(UserLoginView)),
+    path('api/v1/logout', api_view(UserLogoutView)),
+    path('api/v1/order', api_view(OrderView)),
+    path('api/v1/order/bulk', api_view(OrderBulkView)),
+    path('api/v1/order/<int:order_id>', api_view(OrderIdView)),
+    path('api/v1/order/events', order_event_view()),
+    path('api/v1/product', api_view(ProductView)),
+    path('api/v1/product/bulk', api_view(ProductBulkView)),
+    path('api/v1/product/search', api_view(ProductSearchView)),
+    path('api/v1/product/<int:product_id>', api_view(ProductIdView)),
+    path('api/v1/category', api_view(CategoryView)),
+    path('api/v1/sales', api_view(SalesView)),
+    path('metrics', MetricsView.as_view()),
     path('signup', TemplateView.as_view(template_name='signup_view.html')),
     path('login', TemplateView.as_view(template_name='login_view.html')),
     path('logout', LogoutPageView.as_view()),
@@ -0,0 +1,33 @@
+from asgiref.sync import sync_to_async
+from django.core.handlers import asgi
+
+from store.responses import AsyncStreamingHttpResponse
+
+
+class ASGIHandler(asgi.ASGIHandler):
+    """AsyncStreamingHttpResponse 를 이벤트 루프에서 보낼 수 있는 ASGI 핸들러.
+
+    그 밖의 응답은 Django 의 ASGIHandler 와 같이 보냅니다.
+    """
+
+    async def send_response(self, response, send):
+        if not isinstance(response, AsyncStreamingHttpResponse):
+            return await super().send_response(response, send)
+
+        headers = [
+            (header.encode('ascii'), value.encode('latin1'))
+            for header, value in response.items()
+        ]
+        for cookie in response.cookies.values():
+            headers.append((b'Set-Cookie', cookie.output(header='').encode('ascii').strip()))
+        await send({
+            'type': 'http.response.start',
+            'status': response.status_code,
+            'headers': headers,
+        })
+        try:
+            async for chunk in response:
+                await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+            await send({'type': 'http.response.body'})
+        finally:
+            await sync_to_async(response.close, thread_sensitive=True)()
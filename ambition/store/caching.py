@@ -0,0 +1,90 @@
+import functools
+import hashlib
+import time
+from typing import *
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.http import HttpRequest, HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from store import metrics
+
+
+CATALOG_VERSION_KEY = 'store:catalog-version'
+CATALOG_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def is_process_local_cache(alias: str = 'default') -> bool:
+    """캐시가 프로세스 메모리(LocMemCache)에 있어 다른 프로세스와 공유되지 않는지 확인합니다."""
+    return isinstance(caches[alias], LocMemCache)
+
+
+def catalog_version_timeout() -> Optional[int]:
+    """메뉴 버전을 캐시에 보관할 시간(초).
+
+    공유 캐시라면 바뀔 때까지 보관합니다(None). 프로세스 메모리의 캐시라면 다른 프로세스의 변경을 알 수 없으므로
+    settings.STORE_PROCESS_CACHE_MAX_AGE 초 후에 버전이 만료되어, 캐시된 응답과 검색 색인을 다시 만듭니다.
+    """
+    if not is_process_local_cache():
+        return None
+    return getattr(settings, 'STORE_PROCESS_CACHE_MAX_AGE', 60)
+
+
+def get_catalog_version() -> float:
+    """메뉴(상품, 카테고리)의 현재 버전을 반환합니다.
+
+    버전은 마지막으로 메뉴가 바뀐 시각(UNIX timestamp)입니다.
+    """
+    version = cache.get(CATALOG_VERSION_KEY)
+    if version is None:
+        version = time.time()
+        cache.add(CATALOG_VERSION_KEY, version, timeout=catalog_version_timeout())
+        version = cache.get(CATALOG_VERSION_KEY, version)
+    return version
+
+
+def bump_catalog_version():
+    """메뉴가 바뀌었음을 기록하여 이전 버전으로 캐시된 응답을 모두 무효화합니다."""
+    cache.set(CATALOG_VERSION_KEY, time.time(), timeout=catalog_version_timeout())
+
+
+def catalog_cached(key_func: Callable[[HttpRequest], Any]):
+    """메뉴 조회 View 메서드의 응답을 메뉴 버전 별로 캐시하는 데코레이터.
+
+    key_func 는 요청으로부터 캐시 키를 만들며, 예외를 발생시키면 캐시를 사용하지 않습니다.
+    응답에는 ETag 와 Last-Modified 가 붙고, 클라이언트가 가진 버전이 최신이면 304를 반환합니다.
+    캐시가 적중하면 데이터베이스를 조회하지 않습니다.
+    """
+    def decorator(view_method):
+        @functools.wraps(view_method)
+        def wrapper(self, request: HttpRequest, *args, **kwargs) -> HttpResponse:
+            try:
+                key = repr((request.path, key_func(request)))
+            except Exception:
+                return view_method(self, request, *args, **kwargs)
+            version = get_catalog_version()
+            etag = quote_etag(hashlib.md5(f'{version}:{key}'.encode()).hexdigest())
+            last_modified = int(version)
+
+            response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if response is not None:
+                return response
+
+            cache_key = f'store:catalog:{etag}'
+            response = cache.get(cache_key)
+            if response is None:
+                metrics.cache_requests.inc('catalog', 'miss')
+                response = view_method(self, request, *args, **kwargs)
+                if response.status_code != 200 or response.streaming:
+                    return response
+                cache.set(cache_key, response, timeout=CATALOG_CACHE_TIMEOUT)
+            else:
+                metrics.cache_requests.inc('catalog', 'hit')
+            response['ETag'] = etag
+            response['Last-Modified'] = http_date(last_modified)
+            return response
+        return wrapper
+    return decorator
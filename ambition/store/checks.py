@@ -0,0 +1,21 @@
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+from store.caching import is_process_local_cache
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    """여러 프로세스로 서비스할 때 변경 사항이 늦게 반영되지 않도록, 캐시가 공유되는지 확인합니다."""
+    if not is_process_local_cache():
+        return []
+    max_age = getattr(settings, 'STORE_PROCESS_CACHE_MAX_AGE', 60)
+    return [
+        Warning(
+            'The default cache is process-local (LocMemCache). With more than one process, changes to '
+            f'categories, order statuses, the menu cache and the search index reach other processes '
+            f'only after STORE_PROCESS_CACHE_MAX_AGE ({max_age}s), and logouts are not shared.',
+            hint='Configure a shared cache (Redis, Memcached) in CACHES, or run a single process.',
+            id='store.W001',
+        ),
+    ]
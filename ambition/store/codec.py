@@ -0,0 +1,91 @@
+import json
+from typing import *
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.serializers.json import DjangoJSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class StdlibJsonCodec:
+    name = 'json'
+
+    def __init__(self):
+        self._encoder = DjangoJSONEncoder(ensure_ascii=False, separators=(',', ':'))
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return json.loads(data)
+
+    def dumps(self, obj: Any) -> bytes:
+        return self._encoder.encode(obj).encode()
+
+
+class OrjsonCodec:
+    """orjson 을 사용하는 코덱.
+
+    orjson 은 datetime 을 마이크로초까지 기록하므로, 어떤 코덱을 사용하더라도 같은 JSON 이 만들어지도록
+    datetime, date, time 은 StdlibJsonCodec 과 같이 DjangoJSONEncoder 에 맡긴다. (밀리초, UTC 는 'Z')
+    """
+    name = 'orjson'
+
+    def __init__(self):
+        self._default = DjangoJSONEncoder().default
+        self._option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return orjson.loads(data)
+
+    def dumps(self, obj: Any) -> bytes:
+        return orjson.dumps(obj, default=self._default, option=self._option)
+
+
+CODECS = {
+    StdlibJsonCodec.name: StdlibJsonCodec,
+    OrjsonCodec.name: OrjsonCodec,
+}
+
+_codec = None
+
+
+def create_codec(name: str):
+    """이름에 해당하는 코덱을 생성합니다.
+
+    :raises django.core.exceptions.ImproperlyConfigured: 알 수 없는 코덱이거나 설치되어 있지 않은 경우에 발생.
+    """
+    if name == 'auto':
+        name = OrjsonCodec.name if orjson is not None else StdlibJsonCodec.name
+    if name not in CODECS:
+        raise ImproperlyConfigured(f'Unknown JSON codec: {name}')
+    if name == OrjsonCodec.name and orjson is None:
+        raise ImproperlyConfigured('orjson is not installed')
+    return CODECS[name]()
+
+
+def get_codec():
+    """settings.STORE_JSON_CODEC 에 설정된 코덱을 반환합니다.
+
+    - 'auto' (기본값): orjson 이 설치되어 있다면 orjson, 아니라면 표준 라이브러리 json
+    - 'orjson': orjson
+    - 'json': 표준 라이브러리 json
+    """
+    global _codec
+    if _codec is None:
+        _codec = create_codec(getattr(settings, 'STORE_JSON_CODEC', 'auto'))
+    return _codec
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """JSON 을 파싱합니다.
+
+    :raises ValueError: JSON 형식이 올바르지 않은 경우에 발생.
+    """
+    return get_codec().loads(data)
+
+
+def dumps(obj: Any) -> bytes:
+    """객체를 UTF-8 로 인코딩된 JSON 으로 변환합니다."""
+    return get_codec().dumps(obj)
@@ -1,14 +1,39 @@
 from __future__ import annotations
 
 import dataclasses
+import datetime
 import json
 from typing import *
 
 from django.core.validators import validate_email
 from django.http import HttpRequest
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
 
+from store import codec
 
-REQUEST_BODY_PARSER = json.loads
+
+REQUEST_BODY_PARSER = codec.loads
+
+
+def to_aware_datetime(value: Union[datetime.date, datetime.datetime]) -> datetime.datetime:
+    """날짜 또는 시간대 정보가 없는 일시를 현재 시간대의 일시로 변환합니다."""
+    if not isinstance(value, datetime.datetime):
+        value = datetime.datetime.combine(value, datetime.time())
+    if timezone.is_naive(value):
+        value = timezone.make_aware(value)
+    return value
+
+
+def parse_datetime_or_date(value: str) -> datetime.datetime:
+    """ISO 8601 형식의 일시 또는 날짜 문자열을 시간대 정보가 있는 일시로 변환합니다.
+
+    :raises ValueError: 형식이 올바르지 않은 경우에 발생.
+    """
+    parsed = parse_datetime(value) or parse_date(value)
+    if parsed is None:
+        raise ValueError(f'Invalid datetime: {value}')
+    return to_aware_datetime(parsed)
 
 
 @dataclasses.dataclass
@@ -163,6 +188,39 @@ class ProductQueryDTO:
     soldout: Optional[bool]
 
 
+@dataclasses.dataclass
+class ProductSearchDTO:
+    DEFAULT_LIMIT = 10
+    MAX_LIMIT = 50
+
+    @classmethod
+    def from_request(cls, request: HttpRequest) -> ProductSearchDTO:
+        """Request Query Parameters로부터 DTO 인스턴스를 생성합니다.
+
+        :raises KeyError: 검색어(q)가 없을 경우에 발생.
+        :raises ValueError: limit 의 형식이 올바르지 않은 경우에 발생.
+        """
+        return cls.from_dict(request.GET)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> ProductSearchDTO:
+        """Dict로부터 DTO 인스턴스를 생성합니다.
+
+        :raises KeyError: 검색어(q)가 없을 경우에 발생.
+        :raises ValueError: limit 의 형식이 올바르지 않은 경우에 발생.
+        """
+        dto = ProductSearchDTO(
+            query=data['q'],
+            limit=int(data.get('limit', cls.DEFAULT_LIMIT)),
+        )
+        if not 0 < dto.limit <= cls.MAX_LIMIT:
+            raise ValueError()
+        return dto
+
+    query: str
+    limit: int
+
+
 @dataclasses.dataclass
 class ProductModificationDTO:
     category_id: Optional[int]
@@ -266,24 +324,71 @@ class OrderQueryDTO:
     def from_dict(cls, dict: Dict) -> OrderQueryDTO:
         """Dict로부터 DTO 인스턴스를 생성합니다.
 
+        from, to 는 날짜(YYYY-MM-DD) 또는 ISO 8601 형식의 일시이며, to 는 조회 범위에 포함되지 않습니다.
+
         :raises KeyError: 누락된 속성이 있을 경우에 발생.
         :raises ValueError: 속성의 형식이 올바르지 않은 경우에 발생.
         """
         dto = OrderQueryDTO(
             create_year=dict.get('year'),
             create_month=dict.get('month'),
+            create_day=dict.get('day'),
+            created_from=dict.get('from'),
+            created_to=dict.get('to'),
             status=dict.get('status'),
         )
         if dto.create_year is not None:
             dto.create_year = int(dto.create_year)
         if dto.create_month is not None:
             dto.create_month = int(dto.create_month)
+            if dto.create_year is None:
+                raise ValueError('month 는 year 와 함께 사용해야 합니다.')
+        if dto.create_day is not None:
+            dto.create_day = int(dto.create_day)
+            if dto.create_month is None:
+                raise ValueError('day 는 month 와 함께 사용해야 합니다.')
+        if dto.created_from is not None:
+            dto.created_from = parse_datetime_or_date(dto.created_from)
+        if dto.created_to is not None:
+            dto.created_to = parse_datetime_or_date(dto.created_to)
         if dto.status is not None:
             dto.status = int(dto.status)
         return dto
 
+    def created_range(self) -> Tuple[Optional[datetime.datetime], Optional[datetime.datetime]]:
+        """조회할 생성 일시의 범위 [start, end)를 반환합니다.
+
+        year, month, day 와 from, to 가 함께 주어지면 두 범위가 겹치는 구간을 반환합니다.
+        기간의 끝이 표현할 수 있는 마지막 날짜(9999-12-31)를 넘는다면 끝이 없는 구간(None)으로 조회합니다.
+
+        :raises ValueError: 날짜가 올바르지 않은 경우에 발생.
+        """
+        start, end = self.created_from, self.created_to
+        if self.create_year is not None:
+            if self.create_day is not None:
+                period_start = datetime.date(self.create_year, self.create_month, self.create_day)
+                period_end = period_start + datetime.timedelta(days=1) if period_start < datetime.date.max else None
+            elif self.create_month is not None:
+                period_start = datetime.date(self.create_year, self.create_month, 1)
+                period_end = (
+                    datetime.date(self.create_year + self.create_month // 12, self.create_month % 12 + 1, 1)
+                    if (self.create_year, self.create_month) < (datetime.MAXYEAR, 12) else None
+                )
+            else:
+                period_start = datetime.date(self.create_year, 1, 1)
+                period_end = datetime.date(self.create_year + 1, 1, 1) if self.create_year < datetime.MAXYEAR else None
+            period_start = to_aware_datetime(period_start)
+            start = period_start if start is None else max(start, period_start)
+            if period_end is not None:
+                period_end = to_aware_datetime(period_end)
+                end = period_end if end is None else min(end, period_end)
+        return start, end
+
     create_year: Optional[int]
     create_month: Optional[int]
+    create_day: Optional[int]
+    created_from: Optional[datetime.datetime]
+    created_to: Optional[datetime.datetime]
     status: Optional[int]
 
 
@@ -311,3 +416,124 @@ class OrderModificationDTO:
         return dto
 
     status: int
+
+
+@dataclasses.dataclass
+class OrderBulkModificationDTO:
+    MAX_IDS = 500
+
+    @classmethod
+    def from_request(cls, request: HttpRequest) -> OrderBulkModificationDTO:
+        """Request Body로부터 DTO 인스턴스를 생성합니다.
+
+        :raises KeyError: 누락된 데이터가 있을 경우에 발생.
+        :raises ValueError: 입력 데이터의 형식이 올바르지 않은 경우에 발생.
+        """
+        return cls.from_dict(REQUEST_BODY_PARSER(request.body))
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> OrderBulkModificationDTO:
+        """Dict로부터 DTO 인스턴스를 생성합니다.
+
+        ids 는 1개 이상 MAX_IDS 개 이하의 주문 id 목록이며, 중복된 id 는 한 번만 처리합니다.
+
+        :raises KeyError: 누락된 속성이 있을 경우에 발생.
+        :raises ValueError: 속성의 형식이 올바르지 않은 경우에 발생.
+        """
+        if not isinstance(data['ids'], list):
+            raise ValueError()
+        dto = OrderBulkModificationDTO(
+            ids=list(dict.fromkeys(int(pk) for pk in data['ids'])),
+            status=int(data['status']),
+        )
+        if not 0 < len(dto.ids) <= cls.MAX_IDS:
+            raise ValueError()
+        return dto
+
+    ids: List[int]
+    status: int
+
+
+@dataclasses.dataclass
+class PageQueryDTO:
+    DEFAULT_LIMIT = 20
+    MAX_LIMIT = 100
+
+    @classmethod
+    def from_request(cls, request: HttpRequest) -> PageQueryDTO:
+        """Request Query Parameters로부터 DTO 인스턴스를 생성합니다.
+
+        :raises ValueError: 입력 데이터의 형식이 올바르지 않은 경우에 발생.
+        """
+        return cls.from_dict(request.GET)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> PageQueryDTO:
+        """Dict로부터 DTO 인스턴스를 생성합니다.
+
+        limit 과 cursor 가 모두 없으면 페이지를 나누지 않습니다.
+
+        :raises ValueError: 속성의 형식이 올바르지 않은 경우에 발생.
+        """
+        dto = PageQueryDTO(
+            limit=data.get('limit'),
+            cursor=data.get('cursor'),
+        )
+        if dto.limit is not None:
+            dto.limit = int(dto.limit)
+            if not 0 < dto.limit <= cls.MAX_LIMIT:
+                raise ValueError()
+        elif dto.cursor is not None:
+            dto.limit = cls.DEFAULT_LIMIT
+        return dto
+
+    @property
+    def is_paginated(self) -> bool:
+        return self.limit is not None
+
+    limit: Optional[int]
+    cursor: Optional[str]
+
+
+@dataclasses.dataclass
+class SalesQueryDTO:
+    @classmethod
+    def from_request(cls, request: HttpRequest) -> SalesQueryDTO:
+        """Request Query Parameters로부터 DTO 인스턴스를 생성합니다.
+
+        :raises ValueError: 입력 데이터의 형식이 올바르지 않은 경우에 발생.
+        """
+        return cls.from_dict(request.GET)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> SalesQueryDTO:
+        """Dict로부터 DTO 인스턴스를 생성합니다.
+
+        granularity 는 hour 또는 day 이며, 기본값은 day 입니다.
+
+        :raises ValueError: 속성의 형식이 올바르지 않은 경우에 발생.
+        """
+        dto = SalesQueryDTO(
+            granularity=data.get('granularity', 'day'),
+            created_from=data.get('from'),
+            created_to=data.get('to'),
+        )
+        if dto.granularity not in ('hour', 'day'):
+            raise ValueError(f'Invalid granularity: {dto.granularity}')
+        if dto.created_from is not None:
+            dto.created_from = parse_datetime_or_date(dto.created_from)
+        if dto.created_to is not None:
+            dto.created_to = parse_datetime_or_date(dto.created_to)
+        return dto
+
+    def filter_kwargs(self) -> Dict:
+        kwargs = {'granularity': self.granularity}
+        if self.created_from is not None:
+            kwargs['bucket__gte'] = self.created_from
+        if self.created_to is not None:
+            kwargs['bucket__lt'] = self.created_to
+        return kwargs
+
+    granularity: str
+    created_from: Optional[datetime.datetime]
+    created_to: Optional[datetime.datetime]
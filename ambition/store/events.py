@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import asyncio
+import collections
+import dataclasses
+import threading
+from typing import *
+
+from django.dispatch import Signal
+
+from store import codec
+
+
+# 주문이 생성되거나(created=True) 상태가 바뀌면(created=False) 커밋 후에 발생합니다. 인자: order, created
+order_changed = Signal()
+
+
+@dataclasses.dataclass
+class OrderEvent:
+    id: int
+    type: str
+    data: dict
+
+    def to_sse(self) -> str:
+        """Server-Sent Events 형식의 메시지로 변환합니다."""
+        data = codec.dumps(self.data).decode()
+        return f'id: {self.id}\nevent: {self.type}\ndata: {data}\n\n'
+
+
+class OrderEventHub:
+    """주문 이벤트를 구독자들에게 전달하는 프로세스 내부의 허브.
+
+    최근 history 개의 이벤트를 보관하므로, 재접속한 구독자는 마지막으로 받은 이벤트 이후부터 이어서 받을 수 있습니다.
+    이벤트는 발행한 프로세스 안에서만 전달되므로, 여러 프로세스로 서비스할 때에는 주문 화면과 주문 API 를
+    같은 프로세스로 보내야 합니다.
+    스레드에서는 wait() 로, 이벤트 루프에서는 스레드를 붙잡지 않는 wait_async() 로 기다립니다.
+    """
+
+    def __init__(self, history: int = 1000):
+        self._events = collections.deque(maxlen=history)
+        self._condition = threading.Condition()
+        self._async_waiters = set()
+        self._last_id = 0
+
+    @property
+    def last_id(self) -> int:
+        return self._last_id
+
+    def publish(self, type: str, data: dict) -> OrderEvent:
+        with self._condition:
+            self._last_id += 1
+            event = OrderEvent(id=self._last_id, type=type, data=data)
+            self._events.append(event)
+            self._condition.notify_all()
+            for loop, waiter in self._async_waiters:
+                loop.call_soon_threadsafe(waiter.set)
+        return event
+
+    def wait(self, last_id: int, timeout: float) -> Optional[List[OrderEvent]]:
+        """last_id 이후의 이벤트를 반환합니다. 아직 없다면 최대 timeout 초 동안 기다립니다.
+
+        last_id 이후의 이벤트 중 일부가 이미 보관 기간을 지났거나, last_id 가 이 허브에서 발행한 적 없는 값이라면
+        이어서 받을 수 없으므로 None 을 반환합니다.
+        """
+        with self._condition:
+            if last_id > self._last_id:
+                return None
+            self._condition.wait_for(lambda: self._last_id > last_id, timeout=timeout)
+            return self._since(last_id)
+
+    async def wait_async(self, last_id: int, timeout: float) -> Optional[List[OrderEvent]]:
+        """wait() 와 같지만, 스레드를 붙잡지 않고 현재 이벤트 루프에서 기다립니다."""
+        waiter = (asyncio.get_running_loop(), asyncio.Event())
+        with self._condition:
+            if last_id > self._last_id:
+                return None
+            if self._last_id > last_id:
+                return self._since(last_id)
+            self._async_waiters.add(waiter)
+        try:
+            await asyncio.wait_for(waiter[1].wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            with self._condition:
+                self._async_waiters.discard(waiter)
+        with self._condition:
+            return self._since(last_id)
+
+    def _since(self, last_id: int) -> Optional[List[OrderEvent]]:
+        if self._last_id == last_id:
+            return []
+        if self._events[0].id > last_id + 1:
+            return None
+        return [event for event in self._events if event.id > last_id]
+
+
+order_event_hub = OrderEventHub()
@@ -1,2 +1,7 @@
 class UserNotLoggedInException(Exception):
     pass
+
+
+class OrderStatusConflictException(Exception):
+    """주문의 현재 상태에서 요청한 상태로 변경할 수 없는 경우에 발생합니다."""
+    pass
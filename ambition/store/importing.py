@@ -0,0 +1,226 @@
+from __future__ import annotations
+
+import codecs
+import csv
+import dataclasses
+from typing import *
+
+from django.db import DatabaseError, IntegrityError, transaction
+from django.db.models import Q
+
+from store import codec
+from store.caching import bump_catalog_version
+from store.dto import *
+from store.models import Category, Product
+
+
+@dataclasses.dataclass
+class ImportResult:
+    created: int = 0
+    updated: int = 0
+    errors: List[dict] = dataclasses.field(default_factory=list)
+
+    def error(self, line: int, message: str):
+        self.errors.append({'line': line, 'message': message})
+
+
+def iter_lines(stream: Iterable[bytes]) -> Iterator[str]:
+    """바이트 줄의 스트림을 UTF-8 문자열 줄로 읽습니다. 여러 줄에 걸친 문자도 올바르게 디코딩합니다.
+
+    :raises UnicodeDecodeError: UTF-8 이 아닌 바이트가 있는 경우에 발생.
+    """
+    decoder = codecs.getincrementaldecoder('utf-8-sig')()
+    for chunk in stream:
+        yield decoder.decode(chunk)
+    yield decoder.decode(b'', final=True)
+
+
+def iter_jsonl(lines: Iterable[str]) -> Iterator[Tuple[int, Union[dict, Exception]]]:
+    """JSON Lines 를 한 줄씩 읽어 (줄 번호, dict) 를 반환합니다. 읽을 수 없는 줄은 dict 대신 예외를 반환합니다."""
+    for line_no, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            row = codec.loads(line)
+            if not isinstance(row, dict):
+                raise ValueError('Row is not an object')
+            yield line_no, row
+        except ValueError as e:
+            yield line_no, e
+
+
+def iter_csv(lines: Iterable[str]) -> Iterator[Tuple[int, Union[dict, Exception]]]:
+    """첫 줄을 머리글로 하는 CSV 를 한 줄씩 읽어 (줄 번호, dict) 를 반환합니다.
+
+    id 가 있는 행(수정)의 빈 칸은 값을 바꾸지 않는 것으로 봅니다.
+    """
+    reader = csv.DictReader(lines)
+    for row in reader:
+        empty = ('', None) if row.get('id') else (None,)
+        yield reader.line_num, {key: value for key, value in row.items()
+                                if key and value not in empty and not (key == 'id' and not value)}
+
+
+def split_lines(chunks: Iterable[str]) -> Iterator[str]:
+    """임의로 나뉜 문자열 조각을 줄 단위로 다시 나눕니다."""
+    buffer = ''
+    for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split('\n')
+        yield from (line + '\n' for line in lines)
+    if buffer:
+        yield buffer
+
+
+def iter_rows(stream: Iterable[bytes], format: str) -> Iterator[Tuple[int, Union[dict, Exception]]]:
+    """format('jsonl' 또는 'csv') 형식의 바이트 스트림을 한 줄씩 읽습니다.
+
+    :raises ValueError: 지원하지 않는 형식인 경우에 발생.
+    :raises UnicodeDecodeError: 읽는 도중 UTF-8 이 아닌 바이트가 있는 경우에 발생.
+    """
+    lines = split_lines(iter_lines(stream))
+    if format == 'jsonl':
+        return iter_jsonl(lines)
+    if format == 'csv':
+        return iter_csv(lines)
+    raise ValueError(f'Unsupported format: {format}')
+
+
+def import_products(rows: Iterable[Tuple[int, Union[dict, Exception]]], batch_size: int = 500) -> ImportResult:
+    """상품을 한꺼번에 추가하거나 수정합니다.
+
+    id 가 있는 행은 해당 상품을 수정하고, id 가 없는 행은 같은 이름의 상품이 있으면 수정, 없으면 추가합니다.
+    행은 batch_size 개씩 하나의 트랜잭션에서 bulk_create, bulk_update 로 저장하며,
+    잘못된 행은 건너뛰고 줄 번호와 함께 결과의 errors 에 기록합니다.
+
+    기존 상품과 값이 같은 행은 저장하지 않으며, 수정은 바뀐 속성만 저장합니다.
+    bulk_create, bulk_update 는 시그널을 보내지 않으므로 끝난 뒤에 메뉴 버전을 직접 갱신합니다.
+
+    :raises UnicodeDecodeError: rows 를 읽는 도중 발생한 경우. 이전 묶음까지 저장된 행은 그대로 남습니다.
+    """
+    result = ImportResult()
+    category_ids = set(Category.objects.values_list('pk', flat=True))
+    batch = []
+    try:
+        for line_no, row in rows:
+            if isinstance(row, Exception):
+                result.error(line_no, str(row) or type(row).__name__)
+                continue
+            batch.append((line_no, row))
+            if len(batch) >= batch_size:
+                _import_batch(batch, category_ids, result)
+                batch = []
+        if batch:
+            _import_batch(batch, category_ids, result)
+    finally:
+        if result.created or result.updated:
+            bump_catalog_version()
+    result.errors.sort(key=lambda error: error['line'])
+    return result
+
+
+def _check_lengths(dto: Union[ProductCreationDTO, ProductModificationDTO]):
+    """문자열 속성이 데이터베이스 컬럼의 길이를 넘지 않는지 확인합니다.
+
+    :raises ValueError: 문자열이 아니거나 너무 긴 경우에 발생.
+    """
+    for attribute, field in (('name', 'name'), ('image_url', 'primary_image_url')):
+        value = getattr(dto, attribute)
+        if value is None:
+            continue
+        if not isinstance(value, str):
+            raise ValueError(f'{attribute} must be a string')
+        max_length = Product._meta.get_field(field).max_length
+        if len(value) > max_length:
+            raise ValueError(f'{attribute} is too long (max {max_length})')
+
+
+def _import_batch(batch: List[Tuple[int, dict]], category_ids: Set[int], result: ImportResult):
+    ids, names = set(), set()
+    parsed = []
+    for line_no, row in batch:
+        try:
+            if 'id' in row:
+                pk, dto = int(row['id']), ProductModificationDTO.from_dict(row)
+                ids.add(pk)
+            else:
+                pk, dto = None, ProductCreationDTO.from_dict(row)
+            if dto.category_id is not None and dto.category_id not in category_ids:
+                raise ValueError('Category not found')
+            _check_lengths(dto)
+            if dto.name is not None:
+                names.add(dto.name)
+        except KeyError as e:
+            result.error(line_no, f'Missing field: {e.args[0]}')
+            continue
+        except (TypeError, ValueError) as e:
+            result.error(line_no, str(e) or 'Invalid value')
+            continue
+        parsed.append((line_no, pk, dto))
+
+    existing = Product.objects.filter(Q(pk__in=ids) | Q(name__in=names)).in_bulk()
+    existing_names = {entity.name: entity for entity in existing.values() if entity.name in names}
+    created, updated, applied, fields, changed_fields = {}, {}, {}, set(), {}
+    for line_no, pk, dto in parsed:
+        if pk is None:
+            entity = existing_names.get(dto.name) or created.get(dto.name) or Product(name=dto.name)
+        else:
+            entity = existing.get(pk)
+            if entity is None:
+                result.error(line_no, 'Product not found')
+                continue
+        owner = existing_names.get(dto.name) or created.get(dto.name)
+        if dto.name is not None and owner is not None and owner is not entity:
+            result.error(line_no, 'Duplicate name')
+            continue
+        changes = {
+            'category_id': dto.category_id,
+            'name': dto.name,
+            'primary_image_url': dto.image_url,
+            'regular_price': dto.price,
+            'is_soldout': dto.soldout,
+        }
+        if dto.name is not None:
+            existing_names.pop(entity.name, None)
+            existing_names[dto.name] = entity
+        for field, value in changes.items():
+            if value is not None and (entity.pk is None or getattr(entity, field) != value):
+                setattr(entity, field, value)
+                fields.add(field)
+                changed_fields.setdefault(id(entity), set()).add(field)
+                updated.setdefault(entity.pk, entity)
+        if entity.pk is None:
+            created[entity.name] = entity
+        applied[line_no] = entity
+    updated.pop(None, None)
+
+    try:
+        with transaction.atomic():
+            Product.objects.bulk_create(created.values())
+            if updated:
+                fields = sorted('category' if field == 'category_id' else field for field in fields)
+                Product.objects.bulk_update(updated.values(), fields, batch_size=100)
+    except DatabaseError:
+        # 다른 요청과 동시에 같은 이름을 추가한 경우 등. 행 단위로 다시 저장하여 실패한 행만 기록한다.
+        # 빠른 경로와 같이 값이 바뀐 기존 상품만, 바뀐 속성만 저장한다.
+        new = {id(entity) for entity in created.values()}
+        created, updated = {}, {}
+        for line_no, entity in applied.items():
+            is_new = id(entity) in new
+            if not is_new and id(entity) not in changed_fields:
+                continue
+            try:
+                with transaction.atomic():
+                    if is_new:
+                        entity.save()
+                    else:
+                        entity.save(update_fields=changed_fields[id(entity)])
+            except IntegrityError:
+                result.error(line_no, 'Duplicate name')
+                continue
+            except DatabaseError:
+                result.error(line_no, 'Invalid value')
+                continue
+            (created if is_new else updated)[entity.pk] = entity
+    result.created += len(created)
+    result.updated += len(updated)
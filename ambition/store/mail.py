@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+import time
+from typing import *
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+
+from store import metrics
+
+
+logger = logging.getLogger(__name__)
+
+
+class MailQueue:
+    """이메일을 백그라운드 스레드에서 보내는 발송 큐.
+
+    각 작업 스레드는 SMTP 연결을 열어둔 채로 큐에 쌓인 메일을 최대 batch_size 개씩 묶어 send_messages 한 번으로 보내고,
+    idle_timeout 초 동안 보낼 메일이 없으면 연결을 닫습니다.
+    발송에 실패하면 이미 보낸 메일은 제외하고, 실패한 메일부터 backoff * 2^n 초 간격으로 max_retries 번까지 다시 보냅니다.
+
+    큐는 프로세스 메모리에만 존재하므로 프로세스가 종료되면 보내지 못한 메일은 사라집니다.
+    """
+
+    def __init__(self, workers: int = 2, batch_size: int = 20, max_retries: int = 3,
+                 backoff: float = 1.0, idle_timeout: float = 30.0,
+                 connection_factory: Callable = get_connection):
+        self.workers = workers
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.idle_timeout = idle_timeout
+        self.connection_factory = connection_factory
+        self.sent_count = 0
+        self.failed_count = 0
+        self._queue = queue.Queue()
+        self._threads = []
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls) -> MailQueue:
+        """settings.STORE_MAIL_QUEUE 의 설정으로 발송 큐를 생성합니다."""
+        options = getattr(settings, 'STORE_MAIL_QUEUE', {})
+        return cls(
+            workers=options.get('WORKERS', 2),
+            batch_size=options.get('BATCH_SIZE', 20),
+            max_retries=options.get('MAX_RETRIES', 3),
+            backoff=options.get('BACKOFF', 1.0),
+            idle_timeout=options.get('IDLE_TIMEOUT', 30.0),
+        )
+
+    def enqueue(self, message: EmailMessage):
+        """메일을 큐에 넣고 바로 반환합니다."""
+        self._start()
+        self._queue.put(message)
+        metrics.emails.inc('queued')
+
+    def depth(self) -> int:
+        """아직 보내지 않은 메일의 수를 반환합니다."""
+        return self._queue.qsize()
+
+    def join(self):
+        """큐에 있는 모든 메일의 발송이 끝날 때까지 기다립니다."""
+        self._queue.join()
+
+    def _start(self):
+        if len(self._threads) >= self.workers:
+            return
+        with self._lock:
+            while len(self._threads) < self.workers:
+                thread = threading.Thread(target=self._work, name=f'mail-queue-{len(self._threads)}',
+                                          daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def _work(self):
+        connection = None
+        while True:
+            try:
+                batch = [self._queue.get(timeout=self.idle_timeout)]
+            except queue.Empty:
+                connection = self._close(connection)
+                continue
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                connection = self._send_batch(connection, batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _send_batch(self, connection, batch: List[EmailMessage]):
+        """batch 를 send_messages 한 번으로 보냅니다. 실패하면 실패한 메일부터 남은 메일만 다시 보냅니다.
+
+        같은 메일이 max_retries 번 넘게 실패하면 그 메일은 포기하고 나머지를 계속 보냅니다.
+        """
+        pending = list(batch)
+        attempt = 0
+        while pending:
+            messages = _TrackedMessages(pending)
+            try:
+                if connection is None:
+                    connection = self.connection_factory()
+                    connection.open()
+                connection.send_messages(messages)
+            except Exception:
+                # 백엔드는 메일을 순서대로 보내므로, 실패한 메일보다 앞의 메일은 보낸 것이다.
+                sent = min(max(messages.taken - 1, 0), len(pending) - 1)
+                if sent:
+                    self._record_sent(sent)
+                    pending, attempt = pending[sent:], 0
+                logger.warning('Failed to send email to %s (attempt %d)', pending[0].to, attempt + 1,
+                               exc_info=True)
+                connection = self._close(connection)
+                if attempt < self.max_retries:
+                    time.sleep(self.backoff * 2 ** attempt)
+                    attempt += 1
+                    continue
+                message = pending.pop(0)
+                attempt = 0
+                with self._lock:
+                    self.failed_count += 1
+                metrics.emails.inc('failed')
+                logger.error('Gave up sending email to %s', message.to)
+                continue
+            self._record_sent(len(pending))
+            break
+        return connection
+
+    def _record_sent(self, count: int):
+        with self._lock:
+            self.sent_count += count
+        metrics.emails.inc('sent', amount=count)
+
+    @staticmethod
+    def _close(connection):
+        if connection is not None:
+            try:
+                connection.close()
+            except Exception:
+                pass
+        return None
+
+
+class _TrackedMessages(list):
+    """send_messages 가 실패했을 때 어디까지 보냈는지 알 수 있도록, 백엔드가 꺼내간 메일의 수를 기록하는 목록."""
+
+    def __init__(self, messages: List[EmailMessage]):
+        super().__init__(messages)
+        self.taken = 0
+
+    def __iter__(self):
+        for message in super().__iter__():
+            self.taken += 1
+            yield message
+
+
+mail_queue = MailQueue.from_settings()
+metrics.registry.gauge('store_mail_queue_depth', '아직 보내지 않은 인증 메일 수', mail_queue.depth)
@@ -0,0 +1,212 @@
+import itertools
+import json
+import logging
+import platform
+import statistics
+import subprocess
+import time
+import tracemalloc
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, get_resolver
+
+from store.mail import mail_queue
+from store.models import *
+
+
+def product_bulk_body(ctx):
+    """요청마다 새 상품 10개를 추가하고 기존 상품 10개의 가격을 바꾸는 JSON Lines Body 를 만드는 함수를 반환합니다."""
+    counter = itertools.count()
+
+    def body():
+        n = next(counter)
+        rows = [
+            {'category-id': ctx['product'].category_id, 'name': f'벤치마크 상품 {n}-{i}', 'price': 1000,
+             'image-url': '', 'soldout': False}
+            for i in range(10)
+        ]
+        rows += [{'id': product.pk, 'price': product.regular_price + n + 1} for product in ctx['products']]
+        return ''.join(json.dumps(row, ensure_ascii=False) + '\n' for row in rows).encode()
+
+    return body
+
+
+def order_bulk_body(ctx):
+    """요청마다 접수(1) 상태인 주문 20개를 다음 상태(2)로 변경하는 Body 를 만드는 함수를 반환합니다.
+
+    상태는 되돌릴 수 없으므로 요청마다 다른 주문을 사용하며, 주문이 모자라면 처음부터 다시 사용합니다. (unchanged)
+    """
+    chunks = itertools.cycle([ctx['new_orders'][i:i + 20] for i in range(0, len(ctx['new_orders']), 20)] or [[0]])
+    return lambda: {'ids': next(chunks), 'status': 2}
+
+
+# 경로 별 요청 방법. 여기에 없는 경로는 GET 으로 요청한다.
+# 각 항목은 (method, 실제 경로를 만드는 함수, 요청 Body 를 만드는 함수) 이다.
+# Body 를 만드는 함수가 함수를 반환하면 요청마다 그 함수로 Body 를 만들며, bytes 인 Body 는 JSON Lines 로 보낸다.
+SCENARIOS = {
+    'api/v1/email/validation': ('post', None, lambda ctx: {'email': 'benchmark@example.com'}),
+    'api/v1/signup': ('post', None, lambda ctx: {
+        'email': 'signup@example.com', 'password': 'password', 'name': '벤치마크', 'validation-code': 'WRONG',
+    }),
+    'api/v1/login': ('post', None, lambda ctx: {'email': ctx['user'].email, 'password': ctx['user'].password}),
+    'api/v1/order': ('get', None, None),
+    'api/v1/order/<int:order_id>': ('get', lambda ctx: f"/api/v1/order/{ctx['order'].pk}", None),
+    'api/v1/product/<int:product_id>': ('patch', lambda ctx: f"/api/v1/product/{ctx['product'].pk}",
+                                        lambda ctx: {'soldout': ctx['product'].is_soldout}),
+    'api/v1/product/bulk': ('post', None, product_bulk_body),
+    'api/v1/order/bulk': ('patch', None, order_bulk_body),
+}
+
+# 벤치마크에서 제외하는 경로. (관리자 페이지, 연결이 끝나지 않는 스트리밍 응답, 로그아웃)
+EXCLUDED = ('admin/', 'api/v1/order/events', 'api/v1/logout', 'logout')
+
+EXTRA_SCENARIOS = [
+    ('api/v1/order [POST]', 'post', '/api/v1/order', lambda ctx: {
+        'items': [{'product-id': ctx['product'].pk, 'quantity': 1}],
+    }),
+    ('api/v1/product [page]', 'get', '/api/v1/product?limit=20', None),
+    ('api/v1/order [page]', 'get', '/api/v1/order?limit=20', None),
+]
+
+
+def percentile(values, p):
+    values = sorted(values)
+    index = min(len(values) - 1, max(0, round(p / 100 * len(values)) - 1))
+    return values[index]
+
+
+class Command(BaseCommand):
+    help = 'ambition/urls.py 의 모든 경로를 테스트 클라이언트로 요청하여 지연 시간, 쿼리 수, 메모리를 측정합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=50, help='경로 당 요청 수')
+        parser.add_argument('--warmup', type=int, default=3, help='측정 전에 보낼 요청 수')
+        parser.add_argument('--output', help='JSON 보고서를 저장할 파일 (없으면 표준 출력)')
+
+    def handle(self, *args, **options):
+        user = User.objects.order_by('pk').first()
+        order = Order.objects.order_by('pk').first()
+        product = Product.objects.order_by('pk').first()
+        if user is None or order is None or product is None:
+            self.stderr.write('데이터가 없습니다. 먼저 python manage.py seed_store 를 실행하세요.')
+            return
+        ctx = {
+            'user': user,
+            'order': order,
+            'product': product,
+            'products': list(Product.objects.order_by('pk')[:10]),
+            'new_orders': list(Order.objects.filter(status=1).order_by('pk').values_list('pk', flat=True)[:5000]),
+        }
+
+        results = []
+        # 요청으로 바뀐 데이터는 마지막에 되돌리고, 메일은 실제로 보내지 않는다.
+        # 429 대신 실제 처리 시간을 재도록 요청 횟수 제한은 끈다.
+        # 500 응답은 보고서의 errors 로 집계하므로 요청 로그는 남기지 않는다.
+        request_logger = logging.getLogger('django.request')
+        request_logger.disabled = True
+        with override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+                               STORE_RATE_LIMIT={'ENABLED': False}):
+            with transaction.atomic():
+                client = Client(raise_request_exception=False)
+                session = client.session
+                session[User.SESSION_CURRENT_USER_KEY] = user.pk
+                session.save()
+                for name, method, path, body in self.scenarios(ctx):
+                    results.append(self.measure(client, name, method, path, body,
+                                                options['requests'], options['warmup']))
+                transaction.set_rollback(True)
+            mail_queue.join()
+        request_logger.disabled = False
+
+        report = {
+            'commit': self.git_commit(),
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'environment': {
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': connection.vendor,
+            },
+            'data': {
+                'categories': Category.objects.count(),
+                'products': Product.objects.count(),
+                'users': User.objects.count(),
+                'orders': Order.objects.count(),
+            },
+            'routes': results,
+        }
+        output = json.dumps(report, ensure_ascii=False, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(output)
+            for result in results:
+                self.stdout.write(
+                    f"{result['route']:<36}{result['status']:>5}{result['p50_ms']:>9.2f}ms"
+                    f"{result['p99_ms']:>9.2f}ms{result['queries']:>7.1f}q{result['peak_memory_kb']:>10.1f}KB"
+                )
+        else:
+            self.stdout.write(output)
+
+    def scenarios(self, ctx):
+        for pattern in get_resolver().url_patterns:
+            if not isinstance(pattern, URLPattern):
+                continue
+            route = str(pattern.pattern)
+            if route.startswith(EXCLUDED):
+                continue
+            method, path, body = SCENARIOS.get(route, ('get', None, None))
+            yield route, method, path(ctx) if path else f'/{route}', body(ctx) if body else None
+        for name, method, path, body in EXTRA_SCENARIOS:
+            yield name, method, path, body(ctx) if body else None
+
+    def measure(self, client, name, method, path, body, requests, warmup) -> dict:
+        def request():
+            data = body() if callable(body) else body
+            if data is None:
+                return getattr(client, method)(path)
+            if isinstance(data, bytes):
+                return getattr(client, method)(path, data=data, content_type='application/x-ndjson')
+            return getattr(client, method)(path, data=data, content_type='application/json')
+
+        for _ in range(warmup):
+            request()
+        latencies, queries, statuses = [], [], []
+        for _ in range(requests):
+            with CaptureQueriesContext(connection) as context:
+                started = time.perf_counter()
+                response = request()
+                latencies.append((time.perf_counter() - started) * 1000)
+            queries.append(len(context.captured_queries))
+            statuses.append(response.status_code)
+
+        tracemalloc.start()
+        request()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        return {
+            'route': name,
+            'method': method.upper(),
+            'path': path,
+            'status': statuses[-1],
+            'requests': requests,
+            'errors': sum(1 for status in statuses if status >= 500),
+            'mean_ms': statistics.mean(latencies),
+            'p50_ms': percentile(latencies, 50),
+            'p90_ms': percentile(latencies, 90),
+            'p99_ms': percentile(latencies, 99),
+            'max_ms': max(latencies),
+            'queries': statistics.mean(queries),
+            'peak_memory_kb': peak / 1024,
+        }
+
+    @staticmethod
+    def git_commit():
+        try:
+            return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                                  check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
@@ -0,0 +1,79 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import AsyncClient, Client
+
+
+class Command(BaseCommand):
+    help = 'WSGI(동기 View)와 ASGI(비동기 View)의 처리량을 같은 조건에서 비교합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default='/api/v1/product', help='요청할 경로')
+        parser.add_argument('--requests', type=int, default=500, help='보낼 요청의 수')
+        parser.add_argument('--concurrency', type=int, default=20, help='동시에 보낼 요청의 수')
+        parser.add_argument('--mode', choices=['both', 'wsgi', 'asgi'], default='both')
+
+    def handle(self, *args, **options):
+        if options['mode'] != 'both':
+            result = self.run(options['mode'], options['path'], options['requests'], options['concurrency'])
+            self.stdout.write(json.dumps(result))
+            return
+        # urls.py 는 STORE_ASYNC_API 에 따라 View 를 고르므로 방식마다 별도의 프로세스에서 측정한다.
+        for mode in ('wsgi', 'asgi'):
+            env = dict(os.environ, STORE_ASYNC_API='true' if mode == 'asgi' else 'false')
+            output = subprocess.run(
+                [sys.executable, sys.argv[0], 'benchmark_asgi', '--mode', mode,
+                 '--path', options['path'], '--requests', str(options['requests']),
+                 '--concurrency', str(options['concurrency'])],
+                env=env, check=True, capture_output=True, text=True,
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            self.stdout.write(
+                f"{mode}: {result['throughput']:.1f} req/s "
+                f"(requests={result['requests']}, concurrency={result['concurrency']}, "
+                f"errors={result['errors']})"
+            )
+
+    def run(self, mode, path, requests, concurrency) -> dict:
+        if (mode == 'asgi') != settings.STORE_ASYNC_API:
+            raise ValueError(f'STORE_ASYNC_API must be {"true" if mode == "asgi" else "false"} for {mode}')
+        started = time.perf_counter()
+        if mode == 'wsgi':
+            statuses = self.run_wsgi(path, requests, concurrency)
+        else:
+            statuses = asyncio.run(self.run_asgi(path, requests, concurrency))
+        elapsed = time.perf_counter() - started
+        return {
+            'mode': mode,
+            'path': path,
+            'requests': requests,
+            'concurrency': concurrency,
+            'elapsed': elapsed,
+            'throughput': requests / elapsed,
+            'errors': sum(1 for status in statuses if status >= 500),
+        }
+
+    @staticmethod
+    def run_wsgi(path, requests, concurrency):
+        def request(_):
+            return Client().get(path).status_code
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            return list(executor.map(request, range(requests)))
+
+    @staticmethod
+    async def run_asgi(path, requests, concurrency):
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def request():
+            async with semaphore:
+                return (await AsyncClient().get(path)).status_code
+
+        return await asyncio.gather(*(request() for _ in range(requests)))
@@ -0,0 +1,69 @@
+import datetime
+import timeit
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from store import codec
+
+
+def order_payload(index: int) -> dict:
+    now = timezone.now()
+    return {
+        "id": index,
+        "status": {"id": 1, "name": "주문 접수"},
+        "items": [
+            {"product": {"id": i, "name": f"상품 {i}"}, "unit-price": 4500, "quantity": 2}
+            for i in range(3)
+        ],
+        "total_price": 27000,
+        "item_count": 6,
+        "created_at": now,
+        "updated_at": now + datetime.timedelta(minutes=5),
+    }
+
+
+def product_payload(index: int) -> dict:
+    return {
+        "id": index,
+        "category": {"id": index % 5, "name": f"카테고리 {index % 5}"},
+        "name": f"상품 {index}",
+        "image_url": f"https://example.com/images/{index}.png",
+        "price": 4500,
+        "is_soldout": index % 7 == 0,
+    }
+
+
+PAYLOADS = {
+    'GET /api/v1/product': lambda: {"data": {"products": [product_payload(i) for i in range(100)]}},
+    'GET /api/v1/order': lambda: {"data": {"orders": [order_payload(i) for i in range(100)]}},
+    'GET /api/v1/order/<id>': lambda: {"data": {"order": order_payload(1)}},
+    'POST /api/v1/order': lambda: {"items": [{"product-id": i, "quantity": 2} for i in range(5)]},
+    'POST /api/v1/login': lambda: {"email": "admin@example.com", "password": "password"},
+}
+
+
+class Command(BaseCommand):
+    help = '엔드포인트 별 대표 페이로드로 JSON 코덱의 파싱/인코딩 비용을 측정합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--number', type=int, default=1000, help='페이로드 당 반복 횟수')
+
+    def handle(self, *args, **options):
+        number = options['number']
+        codecs = []
+        for name in codec.CODECS:
+            try:
+                codecs.append(codec.create_codec(name))
+            except Exception as e:
+                self.stdout.write(f'{name}: 사용할 수 없음 ({e})')
+
+        self.stdout.write(f'{"payload":<28}{"codec":<10}{"bytes":>8}{"encode(us)":>12}{"parse(us)":>12}')
+        for payload_name, build in PAYLOADS.items():
+            payload = build()
+            for instance in codecs:
+                encoded = instance.dumps(payload)
+                encode = timeit.timeit(lambda: instance.dumps(payload), number=number) / number
+                parse = timeit.timeit(lambda: instance.loads(encoded), number=number) / number
+                self.stdout.write(f'{payload_name:<28}{instance.name:<10}{len(encoded):>8}'
+                                  f'{encode * 1e6:>12.1f}{parse * 1e6:>12.1f}')
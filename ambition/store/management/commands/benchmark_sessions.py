@@ -0,0 +1,69 @@
+import statistics
+import time
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from store.models import User
+
+
+ENGINES = [
+    'django.contrib.sessions.backends.db',
+    'django.contrib.sessions.backends.cached_db',
+    'django.contrib.sessions.backends.cache',
+    'django.contrib.sessions.backends.signed_cookies',
+]
+
+# 실제 캐시를 비우지 않도록 벤치마크 전용 캐시를 사용한다.
+BENCHMARK_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'store-benchmark-sessions',
+    },
+}
+
+
+class Command(BaseCommand):
+    help = '세션 저장소 별로 로그인과 로그인한 요청의 세션 비용(지연 시간, 세션 테이블 쿼리 수)을 측정합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='저장소 당 요청 수')
+        parser.add_argument('--path', default='/api/v1/sales', help='로그인한 상태로 요청할 경로')
+
+    def handle(self, *args, **options):
+        user = User.objects.order_by('pk').first()
+        if user is None:
+            self.stderr.write('데이터가 없습니다. 먼저 python manage.py seed_store 를 실행하세요.')
+            return
+
+        self.stdout.write(f"{'engine':<50}{'login':>10}{'request p50':>14}{'session q/req':>16}")
+        for engine in ENGINES:
+            with override_settings(SESSION_ENGINE=engine, CACHES=BENCHMARK_CACHES, STORE_RATE_LIMIT={'ENABLED': False}):
+                with transaction.atomic():
+                    login, latencies, queries = self.measure(user, options['path'], options['requests'])
+                    transaction.set_rollback(True)
+            self.stdout.write(
+                f'{engine:<50}{login:>8.2f}ms{statistics.median(latencies):>12.2f}ms'
+                f'{statistics.mean(queries):>16.2f}'
+            )
+
+    @staticmethod
+    def measure(user: User, path: str, requests: int):
+        cache.clear()
+        client = Client()
+        started = time.perf_counter()
+        client.post('/api/v1/login', content_type='application/json',
+                    data={'email': user.email, 'password': user.password})
+        login = (time.perf_counter() - started) * 1000
+
+        latencies, queries = [], []
+        for _ in range(requests):
+            with CaptureQueriesContext(connection) as context:
+                started = time.perf_counter()
+                client.get(path)
+                latencies.append((time.perf_counter() - started) * 1000)
+            queries.append(sum(1 for query in context.captured_queries if 'django_session' in query['sql']))
+        return login, latencies, queries
@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from store.importing import import_products, iter_rows
+
+
+class Command(BaseCommand):
+    help = 'JSON Lines 또는 CSV 파일의 상품을 한꺼번에 추가하거나 수정합니다. id 가 있는 행은 해당 상품을 수정합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='상품 파일 (.jsonl 또는 .csv)')
+        parser.add_argument('--format', choices=['jsonl', 'csv'], help='파일 형식 (없으면 확장자로 판단)')
+        parser.add_argument('--batch-size', type=int, default=500, help='한 트랜잭션에서 저장할 행 수')
+
+    def handle(self, *args, **options):
+        format = options['format'] or ('csv' if options['path'].endswith('.csv') else 'jsonl')
+        started = time.perf_counter()
+        try:
+            with open(options['path'], 'rb') as f:
+                result = import_products(iter_rows(f, format), batch_size=options['batch_size'])
+        except OSError as e:
+            raise CommandError(e)
+        elapsed = time.perf_counter() - started
+
+        for error in result.errors:
+            self.stderr.write(f"{error['line']}번째 줄: {error['message']}")
+        self.stdout.write(self.style.SUCCESS(
+            f'{result.created}개 추가, {result.updated}개 수정, {len(result.errors)}개 실패 ({elapsed:.2f}초)'
+        ))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from store.models import ProductSalesRollup, SalesRollup
+
+
+class Command(BaseCommand):
+    help = '주문 내역으로부터 매출 집계 테이블을 다시 만듭니다.'
+
+    def handle(self, *args, **options):
+        SalesRollup.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f'{SalesRollup.objects.count()}개의 매출 집계와 '
+            f'{ProductSalesRollup.objects.count()}개의 상품 매출 집계를 만들었습니다.'
+        ))
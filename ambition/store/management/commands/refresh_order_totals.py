@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from store.models import Order
+
+
+class Command(BaseCommand):
+    help = '주문 항목으로부터 모든 주문의 합계 금액과 수량을 다시 계산합니다.'
+
+    def handle(self, *args, **options):
+        count = Order.refresh_totals()
+        self.stdout.write(self.style.SUCCESS(f'{count}개의 주문을 갱신했습니다.'))
@@ -0,0 +1,108 @@
+import contextlib
+import datetime
+import random
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from store.models import *
+
+
+ORDER_STATUSES = ['주문 접수', '조리 중', '조리 완료', '주문 취소']
+
+
+@contextlib.contextmanager
+def manual_created_at(model):
+    """bulk_create 로 created_at 을 직접 지정할 수 있도록 auto_now_add 를 잠시 끕니다."""
+    field = model._meta.get_field('created_at')
+    field.auto_now_add = False
+    try:
+        yield
+    finally:
+        field.auto_now_add = True
+
+
+class Command(BaseCommand):
+    help = '벤치마크를 위한 카테고리, 상품, 사용자, 주문 데이터를 생성합니다. (SQLite 데이터베이스 권장)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--categories', type=int, default=10)
+        parser.add_argument('--products', type=int, default=200)
+        parser.add_argument('--users', type=int, default=10)
+        parser.add_argument('--orders', type=int, default=10000)
+        parser.add_argument('--items-per-order', type=int, default=3, help='주문 당 최대 주문 항목 수')
+        parser.add_argument('--days', type=int, default=90, help='주문 생성 일시를 분포시킬 기간(일)')
+        parser.add_argument('--seed', type=int, default=0, help='난수 시드')
+        parser.add_argument('--clear', action='store_true', help='기존 데이터를 모두 지우고 생성')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        batch_size = options['batch_size']
+        with transaction.atomic():
+            if options['clear']:
+                for model in (ProductSalesRollup, SalesRollup, OrderItem, Order, Product, Category, User):
+                    model.objects.all().delete()
+            for pk, name in enumerate(ORDER_STATUSES, start=1):
+                OrderStatus.objects.get_or_create(pk=pk, defaults={'name': name})
+
+            offset = Category.objects.count()
+            Category.objects.bulk_create([
+                Category(name=f'카테고리 {offset + i}') for i in range(options['categories'])
+            ], batch_size=batch_size)
+            categories = list(Category.objects.all())
+
+            offset = Product.objects.count()
+            Product.objects.bulk_create([
+                Product(category=rng.choice(categories), name=f'상품 {offset + i}',
+                        primary_image_url=f'/static/images/product-{offset + i}.png',
+                        regular_price=rng.randrange(1000, 20000, 500), is_soldout=rng.random() < 0.1)
+                for i in range(options['products'])
+            ], batch_size=batch_size)
+            products = list(Product.objects.all())
+
+            offset = User.objects.count()
+            User.objects.bulk_create([
+                User(name=f'사용자 {offset + i}', email=f'user{offset + i}@example.com', password='password')
+                for i in range(options['users'])
+            ], batch_size=batch_size)
+
+            self.seed_orders(rng, products, options)
+            SalesRollup.rebuild()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'카테고리 {Category.objects.count()}개, 상품 {Product.objects.count()}개, '
+            f'사용자 {User.objects.count()}명, 주문 {Order.objects.count()}개'
+        ))
+
+    def seed_orders(self, rng, products, options):
+        batch_size = options['batch_size']
+        now = timezone.now()
+        statuses = list(OrderStatus.objects.values_list('pk', flat=True))
+        remaining = options['orders']
+        with manual_created_at(Order):
+            while remaining > 0:
+                count = min(batch_size, remaining)
+                remaining -= count
+                last_pk = Order.objects.order_by('-pk').values_list('pk', flat=True).first() or 0
+                orders, items = [], []
+                for i in range(count):
+                    # bulk_create 가 pk 를 돌려주지 않는 데이터베이스도 있으므로 pk 를 직접 지정한다.
+                    order = Order(
+                        pk=last_pk + i + 1,
+                        status_id=rng.choice(statuses),
+                        created_at=now - datetime.timedelta(seconds=rng.randrange(options['days'] * 86400)),
+                    )
+                    order_items = [
+                        OrderItem(order=order, product=product, unit_price=product.regular_price,
+                                  quantity=rng.randint(1, 3))
+                        for product in rng.sample(products, rng.randint(1, min(options['items_per_order'],
+                                                                               len(products))))
+                    ]
+                    order.total_price = sum(item.unit_price * item.quantity for item in order_items)
+                    order.item_count = sum(item.quantity for item in order_items)
+                    orders.append(order)
+                    items.extend(order_items)
+                Order.objects.bulk_create(orders, batch_size=batch_size)
+                OrderItem.objects.bulk_create(items, batch_size=batch_size)
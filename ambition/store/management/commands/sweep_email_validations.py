@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from store.models import EmailValidation
+
+
+class Command(BaseCommand):
+    help = '만료된 이메일 인증 코드를 삭제합니다. cron 등으로 주기적으로 실행합니다.'
+
+    def handle(self, *args, **options):
+        count = EmailValidation.sweep()
+        self.stdout.write(self.style.SUCCESS(f'{count}개의 인증 코드를 삭제했습니다.'))
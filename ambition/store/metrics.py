@@ -0,0 +1,255 @@
+from __future__ import annotations
+
+import bisect
+import glob
+import ipaddress
+import json
+import os
+import threading
+import time
+from typing import *
+
+from django.conf import settings
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: float = 1):
+        """labels 는 labelnames 의 순서대로 전달합니다."""
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self) -> Dict[str, float]:
+        with self._lock:
+            return {json.dumps(labels): value for labels, value in self._values.items()}
+
+
+class Gauge:
+    """수집할 때 callback 을 호출하여 현재 값을 얻는 게이지."""
+
+    def __init__(self, name: str, help: str, callback: Callable[[], float]):
+        self.name = name
+        self.help = help
+        self.labelnames = ()
+        self.callback = callback
+
+    def samples(self) -> Dict[str, float]:
+        return {json.dumps(()): self.callback()}
+
+
+class Histogram:
+    DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str):
+        """값을 기록합니다. 구간 별 개수와 합계, 전체 개수를 미리 만들어둔 리스트에 더합니다.
+
+        리스트는 [구간 1, ..., 구간 n, +Inf, 합계] 의 구조이며, 누적 값은 수집할 때 계산합니다.
+        """
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._values.get(labels)
+            if counts is None:
+                counts = self._values[labels] = [0] * (len(self.buckets) + 2)
+            counts[index] += 1
+            counts[-1] += value
+
+    def samples(self) -> Dict[str, List[float]]:
+        with self._lock:
+            return {json.dumps(labels): list(counts) for labels, counts in self._values.items()}
+
+
+class Registry:
+    """프로세스 내부의 메트릭 저장소.
+
+    settings.STORE_METRICS_DIR 가 설정되어 있다면 각 프로세스는 FLUSH_INTERVAL 초마다 자신의 값을
+    디렉토리의 {pid}-{시작 시각}.json 파일에 기록하고, 수집할 때에는 모든 프로세스의 파일을 합산합니다.
+    기록은 백그라운드 스레드에서 이루어지므로 요청을 처리하는 경로에는 영향을 주지 않습니다.
+    스레드는 fork 된 자식 프로세스로 이어지지 않으므로(gunicorn --preload 등), pid 가 바뀌면 스레드를 다시 시작합니다.
+
+    카운터와 히스토그램은 값이 줄어들지 않도록 종료된 프로세스의 파일도 합산하고,
+    게이지는 현재 값이므로 살아있는 프로세스의 값만 합산합니다. 디렉토리는 배포할 때마다 비웁니다.
+    """
+    FLUSH_INTERVAL = 5.0
+
+    def __init__(self):
+        self._metrics = {}
+        self._flusher = None
+        self._flusher_pid = None
+        self._lock = threading.Lock()
+        self._pid = None
+        self._filename = None
+
+    def register(self, metric):
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, help, labelnames))
+
+    def histogram(self, name: str, help: str, labelnames: Sequence[str] = (), **kwargs) -> Histogram:
+        return self.register(Histogram(name, help, labelnames, **kwargs))
+
+    def gauge(self, name: str, help: str, callback: Callable[[], float]) -> Gauge:
+        return self.register(Gauge(name, help, callback))
+
+    def snapshot(self) -> Dict[str, dict]:
+        return {
+            name: {
+                'type': type(metric).__name__.lower(),
+                'help': metric.help,
+                'labelnames': list(metric.labelnames),
+                'buckets': list(getattr(metric, 'buckets', ())),
+                'samples': metric.samples(),
+            }
+            for name, metric in self._metrics.items()
+        }
+
+    @staticmethod
+    def directory() -> Optional[str]:
+        return getattr(settings, 'STORE_METRICS_DIR', None)
+
+    def start(self):
+        """여러 프로세스 모드라면 주기적으로 값을 파일에 기록하는 스레드를 시작합니다.
+
+        이 프로세스에서 이미 시작했다면 아무것도 하지 않으므로 요청마다 호출해도 됩니다.
+        """
+        pid = os.getpid()
+        if self._flusher_pid == pid or self.directory() is None:
+            return
+        with self._lock:
+            if self._flusher_pid != pid:
+                self._flusher = threading.Thread(target=self._flush_forever, name='metrics-flusher',
+                                                 daemon=True)
+                self._flusher.start()
+                self._flusher_pid = pid
+
+    def _flush_forever(self):
+        while True:
+            time.sleep(self.FLUSH_INTERVAL)
+            self.flush()
+
+    def flush(self):
+        directory = self.directory()
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, self.filename())
+        with open(f'{path}.tmp', 'w') as f:
+            json.dump(self.snapshot(), f)
+        os.replace(f'{path}.tmp', path)
+
+    def filename(self) -> str:
+        """이 프로세스가 값을 기록할 파일 이름. 같은 pid 가 다시 쓰여도 이전 프로세스의 파일을 덮어쓰지 않습니다."""
+        pid = os.getpid()
+        if self._pid != pid:
+            self._pid, self._filename = pid, f'{pid}-{time.time_ns()}.json'
+        return self._filename
+
+    @staticmethod
+    def is_alive(path: str) -> bool:
+        """파일을 기록한 프로세스가 살아있는지 확인합니다."""
+        try:
+            os.kill(int(os.path.basename(path).split('-')[0]), 0)
+        except (ValueError, ProcessLookupError):
+            return False
+        except PermissionError:
+            return True
+        return True
+
+    def collect(self) -> Dict[str, dict]:
+        """수집할 값을 반환합니다. 여러 프로세스 모드라면 모든 프로세스의 값을 합산합니다."""
+        if self.directory() is None:
+            return self.snapshot()
+        self.flush()
+        merged = {}
+        for path in sorted(glob.glob(os.path.join(self.directory(), '*.json'))):
+            try:
+                with open(path) as f:
+                    snapshot = json.load(f)
+            except (OSError, ValueError):
+                continue
+            alive = self.is_alive(path)
+            for name, metric in snapshot.items():
+                if metric['type'] == 'gauge' and not alive:
+                    continue
+                target = merged.setdefault(name, dict(metric, samples={}))
+                for labels, value in metric['samples'].items():
+                    if labels not in target['samples']:
+                        target['samples'][labels] = value
+                    elif isinstance(value, list):
+                        target['samples'][labels] = [a + b for a, b in zip(target['samples'][labels], value)]
+                    else:
+                        target['samples'][labels] += value
+        return merged
+
+    def render(self) -> str:
+        """Prometheus text exposition format 으로 변환합니다."""
+        lines = []
+        for name, metric in sorted(self.collect().items()):
+            lines.append(f'# HELP {name} {metric["help"]}')
+            lines.append(f'# TYPE {name} {metric["type"]}')
+            for labels, value in sorted(metric['samples'].items()):
+                pairs = list(zip(metric['labelnames'], json.loads(labels)))
+                if metric['type'] != 'histogram':
+                    lines.append(f'{name}{format_labels(pairs)} {format_value(value)}')
+                    continue
+                cumulative = 0
+                for bound, count in zip(metric['buckets'] + ['+Inf'], value[:-1]):
+                    cumulative += count
+                    le = bound if bound == '+Inf' else repr(float(bound))
+                    lines.append(f'{name}_bucket{format_labels(pairs + [("le", le)])} {format_value(cumulative)}')
+                lines.append(f'{name}_sum{format_labels(pairs)} {format_value(value[-1])}')
+                lines.append(f'{name}_count{format_labels(pairs)} {format_value(cumulative)}')
+        return '\n'.join(lines) + '\n'
+
+
+def is_scrape_allowed(ip: Optional[str]) -> bool:
+    """settings.STORE_METRICS_ALLOWED_IPS 의 주소(또는 CIDR 대역)에서 온 요청인지 확인합니다."""
+    try:
+        address = ipaddress.ip_address(ip)
+    except ValueError:
+        return False
+    return any(
+        address in ipaddress.ip_network(network, strict=False)
+        for network in getattr(settings, 'STORE_METRICS_ALLOWED_IPS', ('127.0.0.1', '::1'))
+    )
+
+
+def format_labels(pairs: List[Tuple[str, str]]) -> str:
+    if not pairs:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+
+def format_value(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+registry = Registry()
+
+http_requests = registry.counter(
+    'http_requests_total', 'HTTP 요청 수', ['route', 'method', 'status'])
+http_request_duration = registry.histogram(
+    'http_request_duration_seconds', 'HTTP 요청 처리 시간', ['route', 'method'])
+orders_created = registry.counter(
+    'store_orders_created_total', '생성된 주문 수')
+emails = registry.counter(
+    'store_emails_total', '인증 메일 발송 결과 (queued, sent, failed)', ['result'])
+cache_requests = registry.counter(
+    'store_cache_requests_total', '캐시 조회 결과 (hit, miss)', ['cache', 'result'])
+rate_limited = registry.counter(
+    'store_rate_limited_total', '요청 횟수 제한으로 거절된 요청 수', ['name'])
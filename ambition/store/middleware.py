@@ -0,0 +1,304 @@
+import asyncio
+import collections
+import contextlib
+import logging
+import mimetypes
+import os
+import random
+import re
+import time
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.exceptions import MiddlewareNotUsed, SuspiciousFileOperation
+from django.db import connections
+from django.http import FileResponse, HttpRequest
+from django.middleware.gzip import GZipMiddleware
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.functional import SimpleLazyObject
+from django.utils.http import http_date
+
+from store import metrics
+from store.models import User
+
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncCapableMiddleware:
+    """WSGI 와 ASGI 모두에서 스레드 전환 없이 동작하는 미들웨어의 기반 클래스.
+
+    Django 는 동기 전용 미들웨어가 하나라도 있으면 ASGI 의 모든 요청을 하나의 공유 스레드에서 실행하므로,
+    미들웨어는 동기 방식(__call__)과 비동기 방식(__acall__)을 모두 구현해야 합니다.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            # Django 가 이 미들웨어를 코루틴 함수로 인식하도록 표시한다. (MiddlewareMixin 과 같은 방법)
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request: HttpRequest):
+        if asyncio.iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.handle(request)
+
+    def handle(self, request: HttpRequest):
+        raise NotImplementedError
+
+    async def __acall__(self, request: HttpRequest):
+        raise NotImplementedError
+
+
+class CurrentUserMiddleware(AsyncCapableMiddleware):
+    """request.store_user 에 로그인한 사용자를 담습니다.
+
+    사용자는 처음 접근할 때 조회되며, 로그인 되어있지 않다면 접근 시 UserNotLoggedInException 이 발생합니다.
+    요청 단계에서는 데이터베이스를 조회하지 않으므로 ASGI 에서도 이벤트 루프에서 바로 실행됩니다.
+    """
+
+    def handle(self, request: HttpRequest):
+        self.process_request(request)
+        return self.get_response(request)
+
+    async def __acall__(self, request: HttpRequest):
+        self.process_request(request)
+        return await self.get_response(request)
+
+    @staticmethod
+    def process_request(request: HttpRequest):
+        request.store_user = SimpleLazyObject(lambda: User.current_user(request))
+
+
+class QueryStats:
+    """connection.execute_wrapper 로 설치되어 실행된 쿼리의 수와 시간을 기록합니다."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+            self.statements.append(sql)
+
+    @contextlib.contextmanager
+    def track(self):
+        """현재 스레드의 모든 데이터베이스 연결에서 실행되는 쿼리를 기록합니다."""
+        with contextlib.ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(self))
+            yield self
+
+
+def fingerprint(sql: str) -> str:
+    """값만 다른 쿼리들이 같은 문자열이 되도록 SQL 의 상수와 IN 목록을 '?' 로 바꿉니다."""
+    sql = re.sub(r"'(?:[^']|'')*'", '?', sql)
+    sql = re.sub(r'"s\d+_x\d+"', '?', sql)
+    sql = re.sub(r'\b\d+(?:\.\d+)?\b', '?', sql)
+    sql = re.sub(r'%s', '?', sql)
+    sql = re.sub(r'\(\s*\?(?:\s*,\s*\?)*\s*\)', '(...)', sql)
+    return re.sub(r'\s+', ' ', sql).strip()
+
+
+class QueryAccountingMiddleware(AsyncCapableMiddleware):
+    """요청마다 실행된 쿼리의 수와 데이터베이스 시간을 측정합니다.
+
+    측정 결과는 Server-Timing 헤더(db, app)로 응답에 포함되며, settings.STORE_QUERY_ACCOUNTING 의
+    MAX_QUERIES 나 MAX_DURATION_MS 를 넘는 요청은 많이 실행된 쿼리의 형태(fingerprint)와 함께 경고 로그를 남깁니다.
+    한도는 ROUTES 에 URL 패턴(route) 별로 다르게 둘 수 있으며, None 이면 검사하지 않습니다.
+    SAMPLE_RATE 의 비율만큼의 요청만 측정하므로 운영 환경에서도 켜둘 수 있습니다.
+    스트리밍 응답은 응답을 보내는 동안 실행되는 쿼리를 측정하지 않습니다.
+
+    ASGI 에서는 View 가 다른 스레드에서 실행되므로, request.query_stats 를 async_api_view 가 그 스레드에서 설치합니다.
+    """
+
+    def handle(self, request: HttpRequest):
+        stats = self.sample(request)
+        if stats is None:
+            return self.get_response(request)
+        started = time.perf_counter()
+        with stats.track():
+            response = self.get_response(request)
+        return self.report(request, response, stats, time.perf_counter() - started)
+
+    async def __acall__(self, request: HttpRequest):
+        stats = self.sample(request)
+        if stats is None:
+            return await self.get_response(request)
+        started = time.perf_counter()
+        response = await self.get_response(request)
+        return self.report(request, response, stats, time.perf_counter() - started)
+
+    @staticmethod
+    def sample(request: HttpRequest):
+        """SAMPLE_RATE 의 비율로 요청을 골라 request.query_stats 를 설정합니다. 고르지 않았다면 None 을 반환합니다."""
+        if random.random() >= getattr(settings, 'STORE_QUERY_ACCOUNTING', {}).get('SAMPLE_RATE', 0.05):
+            return None
+        request.query_stats = QueryStats()
+        return request.query_stats
+
+    @staticmethod
+    def report(request: HttpRequest, response, stats: QueryStats, elapsed: float):
+        options = getattr(settings, 'STORE_QUERY_ACCOUNTING', {})
+        match = request.resolver_match
+        if match is not None:
+            options = {**options, **options.get('ROUTES', {}).get(match.route, {})}
+        max_queries = options.get('MAX_QUERIES', 25)
+        max_duration_ms = options.get('MAX_DURATION_MS', 500)
+
+        response['Server-Timing'] = (
+            f'db;dur={stats.duration * 1000:.2f};desc="{stats.count} queries", '
+            f'app;dur={elapsed * 1000:.2f}'
+        )
+        if ((max_queries is not None and stats.count > max_queries)
+                or (max_duration_ms is not None and elapsed * 1000 > max_duration_ms)):
+            top = collections.Counter(map(fingerprint, stats.statements)).most_common(5)
+            logger.warning(
+                '%s %s: %d queries, db %.1fms, total %.1fms\n%s',
+                request.method, request.path, stats.count, stats.duration * 1000, elapsed * 1000,
+                '\n'.join(f'  {count} x {sql}' for sql, count in top),
+            )
+        return response
+
+
+class MetricsMiddleware(AsyncCapableMiddleware):
+    """요청 수와 처리 시간을 URL 패턴(route) 별로 기록합니다.
+
+    경로에 포함된 id 마다 시계열이 생기지 않도록 실제 경로 대신 'api/v1/order/<int:order_id>' 와 같은
+    패턴을 사용하며, 어떤 패턴에도 맞지 않는 요청은 'unmatched' 로 기록합니다.
+    미들웨어가 fork 전의 부모 프로세스에서 만들어질 수 있으므로, 요청마다 이 프로세스의 기록 스레드를 확인합니다.
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        metrics.registry.start()
+
+    def handle(self, request: HttpRequest):
+        started = time.perf_counter()
+        response = self.get_response(request)
+        return self.record(request, response, time.perf_counter() - started)
+
+    async def __acall__(self, request: HttpRequest):
+        started = time.perf_counter()
+        response = await self.get_response(request)
+        return self.record(request, response, time.perf_counter() - started)
+
+    @staticmethod
+    def record(request: HttpRequest, response, elapsed: float):
+        match = request.resolver_match
+        route = match.route if match is not None else 'unmatched'
+        metrics.registry.start()
+        metrics.http_requests.inc(route, request.method, str(response.status_code))
+        metrics.http_request_duration.observe(elapsed, route, request.method)
+        return response
+
+
+class PrecompressedStaticMiddleware(AsyncCapableMiddleware):
+    """STATIC_ROOT 의 정적 파일을 collectstatic 때 미리 압축해둔 파일(.br, .gz)로 제공합니다.
+
+    Accept-Encoding 에 따라 brotli, gzip, 원본 순으로 있는 파일을 고르며,
+    이름에 내용의 해시가 붙은 파일은 내용이 바뀌지 않으므로 1년 동안 다시 요청하지 않도록(immutable) 캐시합니다.
+    해시가 붙지 않은 파일은 settings.STORE_STATIC_MAX_AGE 초 동안 캐시하고 Last-Modified 로 재검증합니다.
+    STATIC_ROOT 에 없는 파일은 다음 처리(개발 서버의 staticfiles 등)로 넘깁니다.
+    """
+    ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+    IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+    def __init__(self, get_response):
+        if not settings.STATIC_ROOT:
+            raise MiddlewareNotUsed()
+        super().__init__(get_response)
+        self._hashed_names = None
+
+    def handle(self, request: HttpRequest):
+        response = self.serve(request)
+        return self.get_response(request) if response is None else response
+
+    async def __acall__(self, request: HttpRequest):
+        response = self.serve(request)
+        return await self.get_response(request) if response is None else response
+
+    def serve(self, request: HttpRequest):
+        """STATIC_ROOT 에 있는 파일이라면 응답을, 아니라면 None 을 반환합니다."""
+        prefix = settings.STATIC_URL
+        if request.method not in ('GET', 'HEAD') or not request.path.startswith(prefix):
+            return None
+        name = request.path[len(prefix):]
+        try:
+            path = safe_join(settings.STATIC_ROOT, name)
+        except SuspiciousFileOperation:
+            return None
+        if not name or not os.path.isfile(path):
+            return None
+
+        stat = os.stat(path)
+        if name in self.hashed_names():
+            cache_control = self.IMMUTABLE_CACHE_CONTROL
+        else:
+            cache_control = f'public, max-age={getattr(settings, "STORE_STATIC_MAX_AGE", 60)}'
+            response = get_conditional_response(request, last_modified=int(stat.st_mtime))
+            if response is not None:
+                response['Cache-Control'] = cache_control
+                return response
+
+        accepted = {part.split(';')[0].strip() for part in request.META.get('HTTP_ACCEPT_ENCODING', '').split(',')}
+        encoding = None
+        for candidate, suffix in self.ENCODINGS:
+            if candidate in accepted and os.path.isfile(path + suffix):
+                encoding, path = candidate, path + suffix
+                break
+
+        content_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+        response = FileResponse(open(path, 'rb'), content_type=content_type)
+        if response.has_header('Content-Disposition'):
+            del response['Content-Disposition']
+        if encoding is not None:
+            response['Content-Encoding'] = encoding
+        response['Cache-Control'] = cache_control
+        response['Last-Modified'] = http_date(stat.st_mtime)
+        patch_vary_headers(response, ('Accept-Encoding',))
+        return response
+
+    def hashed_names(self) -> set:
+        """manifest(staticfiles.json)에 기록된, 해시가 붙은 파일 이름의 집합."""
+        if self._hashed_names is None:
+            self._hashed_names = set(getattr(staticfiles_storage, 'hashed_files', {}).values())
+        return self._hashed_names
+
+
+class ApiGZipMiddleware(AsyncCapableMiddleware):
+    """API 응답을 gzip 으로 압축합니다.
+
+    settings.STORE_API_COMPRESSION 의 MIN_SIZE 바이트 이상인 응답과 스트리밍 응답만 압축하며,
+    이벤트가 바로 전달되어야 하는 text/event-stream 응답은 압축하지 않습니다.
+    압축은 django 의 GZipMiddleware 가 하며, ASGI 에서는 이벤트 루프에서 바로 실행됩니다.
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.gzip = GZipMiddleware(get_response)
+
+    def handle(self, request: HttpRequest):
+        return self.process_response(request, self.get_response(request))
+
+    async def __acall__(self, request: HttpRequest):
+        return self.process_response(request, await self.get_response(request))
+
+    def process_response(self, request: HttpRequest, response):
+        options = getattr(settings, 'STORE_API_COMPRESSION', {})
+        if not options.get('ENABLED', True) or not request.path.startswith('/api/'):
+            return response
+        if response.get('Content-Type', '').startswith('text/event-stream'):
+            return response
+        if not response.streaming and len(response.content) < options.get('MIN_SIZE', 1024):
+            return response
+        return self.gzip.process_response(request, response)
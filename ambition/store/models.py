@@ -1,39 +1,70 @@
 from __future__ import annotations
 
 import datetime
+import functools
+import operator
 import random
 
+from django.core.cache import cache
 from django.core.exceptions import ObjectDoesNotExist, ValidationError
 from django.core.mail import EmailMessage
-from django.db import models
-
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models import (Case, Count, F, OuterRef, Prefetch, Q, Subquery, Sum, Value, When,
+                              prefetch_related_objects)
+from django.db.models.functions import Coalesce, TruncDay, TruncHour
+from django.utils import timezone
+
+from store import metrics, reference
 from store.dto import *
+from store.events import order_changed
 from store.exceptions import *
 
 # Create your models here.
 
 
 class EmailValidation(models.Model):
+    """이메일 인증 코드.
+
+    코드는 settings.STORE_EMAIL_VALIDATION_TTL 초 동안만 유효하며, 만료된 코드는 sweep() 으로 삭제합니다.
+    """
+    SWEEP_PROBABILITY = 0.01
+
+    @classmethod
+    def ttl(cls) -> datetime.timedelta:
+        return datetime.timedelta(seconds=getattr(settings, 'STORE_EMAIL_VALIDATION_TTL', 60 * 10))
+
     @classmethod
     def create_or_update_from_dto(cls, dto: EmailValidationRequestDTO) -> EmailValidation:
-        entity = cls.objects.get_or_create(email=dto.email)[0]
-        entity.codes = cls.generate_codes()
-        entity.created_at = datetime.datetime.now()
-        entity.save()
+        """인증 코드를 새로 발급합니다. 이전에 발급한 코드는 더 이상 사용할 수 없습니다.
+
+        SWEEP_PROBABILITY 의 확률로 만료된 코드를 함께 정리합니다.
+        """
+        entity = cls.objects.update_or_create(
+            email=dto.email,
+            defaults={'codes': cls.generate_codes(), 'created_at': timezone.now()},
+        )[0]
+        if random.random() < cls.SWEEP_PROBABILITY:
+            cls.sweep()
         return entity
 
     @classmethod
     def validate_from_dto(cls, dto: UserRegistrationDTO) -> bool:
-        try:
-            entity = cls.objects.get(email=dto.email)
-            if entity.codes != dto.validation:
-                raise AssertionError()
-            entity.delete()
-        except AssertionError:
-            return False
-        except ObjectDoesNotExist:
-            return False
-        return True
+        """인증 코드가 맞고 만료되지 않았다면 코드를 삭제하고 True 를 반환합니다.
+
+        비교와 삭제를 하나의 DELETE 문으로 수행하므로 같은 코드는 동시에 요청하더라도 한 번만 사용됩니다.
+        """
+        deleted, _ = cls.objects.filter(
+            email=dto.email,
+            codes=dto.validation,
+            created_at__gte=timezone.now() - cls.ttl(),
+        ).delete()
+        return deleted > 0
+
+    @classmethod
+    def sweep(cls) -> int:
+        """만료된 인증 코드를 삭제하고 삭제한 수를 반환합니다."""
+        return cls.objects.filter(created_at__lt=timezone.now() - cls.ttl()).delete()[0]
 
     @classmethod
     def generate_codes(cls, length=5) -> str:
@@ -45,18 +76,23 @@ class EmailValidation(models.Model):
 
     email = models.EmailField(primary_key=True, max_length=64)
     codes = models.EmailField(max_length=6)
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
 
-    def send_email(self):
+    def create_email(self) -> EmailMessage:
         email = EmailMessage()
         email.subject = "야심작 이메일 인증번호"
         email.body = f"인증번호는 {self.codes}입니다."
         email.to = [self.email]
-        email.send()
+        return email
+
+    def send_email(self):
+        self.create_email().send()
 
 
 class User(models.Model):
     SESSION_CURRENT_USER_KEY = 'current-user'
+    REQUEST_CURRENT_USER_ATTR = '_store_user'
+    CACHE_TIMEOUT = 60
 
     @classmethod
     def create_from_dto(cls, dto: UserRegistrationDTO) -> User:
@@ -77,19 +113,41 @@ class User(models.Model):
         except ObjectDoesNotExist:
             raise ValidationError('Email not found')
         request.session[cls.SESSION_CURRENT_USER_KEY] = entity.pk
+        setattr(request, cls.REQUEST_CURRENT_USER_ATTR, entity)
         return entity
 
     @classmethod
     def unauthenticate(cls, request: HttpRequest):
         del request.session[cls.SESSION_CURRENT_USER_KEY]
+        if hasattr(request, cls.REQUEST_CURRENT_USER_ATTR):
+            delattr(request, cls.REQUEST_CURRENT_USER_ATTR)
 
     @classmethod
     def current_user(cls, request: HttpRequest) -> User:
+        """로그인한 사용자를 반환합니다.
+
+        한 요청 안에서는 한 번만 조회하며, 요청 사이에서는 CACHE_TIMEOUT 초 동안 캐시를 사용합니다.
+
+        :raises UserNotLoggedInException: 로그인 되어있지 않은 경우에 발생.
+        """
+        entity = getattr(request, cls.REQUEST_CURRENT_USER_ATTR, None)
+        if entity is not None:
+            return entity
         try:
             pk = int(request.session.get(cls.SESSION_CURRENT_USER_KEY))
-            return cls.objects.get(pk=pk)
+            entity = cache.get(cls.cache_key(pk))
+            metrics.cache_requests.inc('user', 'miss' if entity is None else 'hit')
+            if entity is None:
+                entity = cls.objects.get(pk=pk)
+                cache.set(cls.cache_key(pk), entity, timeout=cls.CACHE_TIMEOUT)
         except Exception:
             raise UserNotLoggedInException()
+        setattr(request, cls.REQUEST_CURRENT_USER_ATTR, entity)
+        return entity
+
+    @classmethod
+    def cache_key(cls, pk: int) -> str:
+        return f'store:user:{pk}'
 
     name = models.CharField(max_length=16)
     email = models.EmailField(max_length=64, unique=True)
@@ -105,7 +163,7 @@ class Product(models.Model):
     @classmethod
     def create_from_dto(cls, dto: ProductCreationDTO) -> Product:
         entity = Product()
-        entity.category = Category.objects.get(pk=int(dto.category_id))
+        entity.category = reference.categories.get(int(dto.category_id))
         entity.name = dto.name
         entity.primary_image_url = dto.image_url
         entity.regular_price = dto.price
@@ -117,7 +175,7 @@ class Product(models.Model):
     def query_from_dto(cls, dto: ProductQueryDTO) -> models.query.QuerySet[Product]:
         kwargs = {}
         if dto.category_id is not None:
-            kwargs['category'] = Category.objects.get(pk=dto.category_id)
+            kwargs['category'] = reference.categories.get(int(dto.category_id))
         if dto.soldout is not None:
             kwargs['is_soldout'] = dto.soldout
         return cls.objects.filter(**kwargs)
@@ -126,7 +184,7 @@ class Product(models.Model):
     def update_from_dto(cls, pk: int, dto: ProductModificationDTO) -> Product:
         entity = Product.objects.get(pk=pk)
         if dto.category_id is not None:
-            entity.category = Category.objects.get(pk=int(dto.category_id))
+            entity.category = reference.categories.get(int(dto.category_id))
         if dto.name is not None:
             entity.name = dto.name
         if dto.image_url is not None:
@@ -147,54 +205,367 @@ class Product(models.Model):
 
 
 class OrderStatus(models.Model):
+    @classmethod
+    def counts_as_sale(cls, pk: int) -> bool:
+        """해당 상태의 주문이 매출에 포함되는지 여부를 반환합니다.
+
+        settings.STORE_SALES_EXCLUDED_STATUSES 에 포함된 상태(예: 주문 취소)는 매출에서 제외됩니다.
+        """
+        return pk not in getattr(settings, 'STORE_SALES_EXCLUDED_STATUSES', ())
+
+    @classmethod
+    def predecessors(cls, pk: int) -> List[int]:
+        """해당 상태로 변경할 수 있는 이전 상태의 pk 목록을 반환합니다. (settings.STORE_ORDER_TRANSITIONS)
+
+        :raises OrderStatus.DoesNotExist: 상태 변경 표에 없는 상태인 경우에 발생.
+        """
+        try:
+            return list(getattr(settings, 'STORE_ORDER_TRANSITIONS', {})[pk])
+        except KeyError:
+            raise cls.DoesNotExist(f'OrderStatus not found: {pk}')
+
     name = models.CharField(max_length=16)
 
 
 class Order(models.Model):
     @classmethod
     def create_from_dto(cls, dto: OrderCreationDTO) -> Order:
-        entities = []
-        order = Order()
-        order.status = OrderStatus.objects.get(pk=1)
-        entities.append(order)
-        for item in dto.items:
-            order_item = OrderItem()
-            order_item.order = order
-            order_item.product = Product.objects.get(pk=item.product_id)
-            order_item.unit_price = order_item.product.regular_price
-            order_item.quantity = item.quantity
-            entities.append(order_item)
-        for entity in entities:
-            entity.save()
+        """주문과 주문 항목을 하나의 트랜잭션으로 생성합니다.
+
+        주문에 포함된 상품은 한 번의 쿼리로 불러오고, 주문 항목은 한 번에 추가합니다.
+
+        :raises Product.DoesNotExist: 존재하지 않는 상품이 포함된 경우에 발생.
+        """
+        with transaction.atomic():
+            products = Product.objects.in_bulk({item.product_id for item in dto.items})
+            missing = sorted({item.product_id for item in dto.items} - products.keys())
+            if missing:
+                raise Product.DoesNotExist(f'Product not found: {missing}')
+            order = Order()
+            order.status = reference.order_statuses.get(1)
+            order_items = []
+            for item in dto.items:
+                order_item = OrderItem()
+                order_item.product = products[item.product_id]
+                order_item.unit_price = order_item.product.regular_price
+                order_item.quantity = item.quantity
+                order_items.append(order_item)
+            order.total_price = sum(item.unit_price * item.quantity for item in order_items)
+            order.item_count = sum(item.quantity for item in order_items)
+            order.save()
+            for order_item in order_items:
+                order_item.order = order
+            OrderItem.objects.bulk_create(order_items)
+            if OrderStatus.counts_as_sale(order.status_id):
+                SalesRollup.record_order(order, order_items, 1)
+            transaction.on_commit(lambda: order_changed.send(sender=cls, order=order, created=True))
         return order
 
+    @classmethod
+    def refresh_totals(cls, queryset: Optional[models.query.QuerySet[Order]] = None) -> int:
+        """주문 항목으로부터 합계 금액과 수량을 다시 계산하여 저장합니다.
+
+        하나의 UPDATE 쿼리로 처리되며, 갱신된 주문의 수를 반환합니다.
+        """
+        if queryset is None:
+            queryset = cls.objects.all()
+        items = OrderItem.objects.filter(order=OuterRef('pk')).order_by().values('order')
+        return queryset.update(
+            total_price=Coalesce(Subquery(
+                items.annotate(total=Sum(F('unit_price') * F('quantity'))).values('total')
+            ), 0),
+            item_count=Coalesce(Subquery(
+                items.annotate(count=Sum('quantity')).values('count')
+            ), 0),
+        )
+
     @classmethod
     def query_from_dto(cls, dto: OrderQueryDTO) -> models.query.QuerySet[Order]:
         kwargs = {}
         if dto.status is not None:
-            kwargs['status'] = OrderStatus.objects.get(pk=dto.status)
-        if dto.create_year is not None:
-            kwargs['created_at__year'] = dto.create_year
-        if dto.create_month is not None:
-            # TODO: 월별 조회 기능 구현
-            raise NotImplementedError('월별 조회 기능은 아직 지원되지 않습니다.')
+            kwargs['status'] = reference.order_statuses.get(dto.status)
+        start, end = dto.created_range()
+        if start is not None:
+            kwargs['created_at__gte'] = start
+        if end is not None:
+            kwargs['created_at__lt'] = end
         return cls.objects.filter(**kwargs)
 
     @classmethod
     def update_from_dto(cls, pk: int, dto: OrderModificationDTO) -> Order:
-        entity = cls.objects.get(pk=pk)
-        entity.status = OrderStatus.objects.get(pk=dto.status)
-        entity.updated_at = datetime.datetime.now()
-        entity.save()
+        """주문의 상태를 변경합니다.
+
+        상태 변경 표(OrderStatus.predecessors)에서 허용된 이전 상태일 때만 변경되도록
+        `UPDATE ... WHERE id = ? AND status IN (...)` 하나로 상태와 updated_at 을 함께 변경하므로,
+        여러 화면에서 동시에 변경하더라도 먼저 반영된 변경을 덮어쓰지 않습니다.
+        이미 요청한 상태라면 아무것도 변경하지 않습니다.
+
+        변경한 뒤에는 주문을 다시 조회하지 않고, 매출 집계와 응답에 필요한 주문 항목을 불러오면서 주문도 함께 불러옵니다.
+
+        :raises Order.DoesNotExist: 존재하지 않는 주문인 경우에 발생.
+        :raises OrderStatus.DoesNotExist: 존재하지 않는 상태이거나 상태 변경 표에 없는 상태인 경우에 발생.
+        :raises OrderStatusConflictException: 주문의 현재 상태에서 요청한 상태로 변경할 수 없는 경우에 발생.
+        """
+        reference.order_statuses.get(dto.status)
+        predecessors = OrderStatus.predecessors(dto.status)
+        is_sale = OrderStatus.counts_as_sale(dto.status)
+        # 매출 포함 여부가 바뀌는 변경은 집계에 반영해야 하므로, 이전 상태를 매출 포함 여부로 나누어 변경한다.
+        # 보통은 한 쪽이 비어있으므로 UPDATE 문은 하나이다.
+        groups = [
+            (was_sale, [status for status in predecessors if OrderStatus.counts_as_sale(status) == was_sale])
+            for was_sale in (is_sale, not is_sale)
+        ]
+        now = timezone.now()
+        with transaction.atomic():
+            for was_sale, group in groups:
+                if group and cls.objects.filter(pk=pk, status__in=group).update(status=dto.status, updated_at=now):
+                    break
+            else:
+                status = cls.objects.filter(pk=pk).values_list('status', flat=True).first()
+                if status is None:
+                    raise cls.DoesNotExist(f'Order not found: {pk}')
+                if status != dto.status:
+                    raise OrderStatusConflictException()
+                return cls.objects.get(pk=pk)
+
+            items = list(OrderItem.objects.filter(order_id=pk).select_related('order', 'product'))
+            entity = items[0].order if items else cls.objects.get(pk=pk)
+            _set_prefetched(entity, 'orderitem_set', items)
+            if was_sale != is_sale:
+                SalesRollup.record_order(entity, items, 1 if is_sale else -1)
+            transaction.on_commit(lambda: order_changed.send(sender=cls, order=entity, created=False))
         return entity
 
+    @classmethod
+    def bulk_update_from_dto(cls, dto: OrderBulkModificationDTO) -> Tuple[Dict[int, str], List[Order]]:
+        """여러 주문의 상태를 한 번에 변경합니다.
+
+        주문 수와 관계없이 대상 주문을 한 번 조회(잠금)하고 하나의 UPDATE 문으로 변경합니다.
+        주문 별 결과('updated', 'unchanged', 'conflict', 'not_found')와 변경된 주문의 목록을 반환하며,
+        변경된 주문은 단일 주문 수정과 같이 매출 집계에 반영되고 커밋 후에 변경 이벤트가 전달됩니다.
+        상태 변경 표에서 허용되지 않는 주문은 변경하지 않고 결과를 'conflict' 로 반환합니다.
+
+        :raises OrderStatus.DoesNotExist: 존재하지 않는 상태이거나 상태 변경 표에 없는 상태인 경우에 발생.
+        """
+        predecessors = OrderStatus.predecessors(dto.status)
+        with transaction.atomic():
+            status = reference.order_statuses.get(dto.status)
+            orders = cls.objects.select_for_update().in_bulk(dto.ids)
+            changed = [order for order in orders.values() if order.status_id in predecessors]
+            now = timezone.now()
+            cls.objects.filter(pk__in=[order.pk for order in changed], status__in=predecessors).update(
+                status=status, updated_at=now)
+
+            prefetch_related_objects(changed, Prefetch('orderitem_set',
+                                                       queryset=OrderItem.objects.select_related('product')))
+            is_sale = OrderStatus.counts_as_sale(status.pk)
+            for order in changed:
+                if OrderStatus.counts_as_sale(order.status_id) != is_sale:
+                    SalesRollup.record_order(order, order.orderitem_set.all(), 1 if is_sale else -1)
+                order.status = status
+                order.updated_at = now
+
+            def send_events():
+                for order in changed:
+                    order_changed.send(sender=cls, order=order, created=False)
+            transaction.on_commit(send_events)
+
+        changed_ids = {order.pk for order in changed}
+        results = {}
+        for pk in dto.ids:
+            if pk in changed_ids:
+                results[pk] = 'updated'
+            elif pk not in orders:
+                results[pk] = 'not_found'
+            else:
+                results[pk] = 'unchanged' if orders[pk].status_id == status.pk else 'conflict'
+        return results, changed
+
     status = models.ForeignKey(OrderStatus, on_delete=models.CASCADE)
-    created_at = models.DateTimeField(auto_now_add=True)
+    # 주문 항목으로부터 계산되는 값으로, 주문 항목이 바뀔 때마다 갱신됩니다.
+    total_price = models.IntegerField(default=0)
+    item_count = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
+
 
 class OrderItem(models.Model):
     order = models.ForeignKey(Order, on_delete=models.CASCADE)
     product = models.ForeignKey(Product, on_delete=models.CASCADE)
     unit_price = models.IntegerField(null=False)
     quantity = models.IntegerField(null=False)
+
+
+class SalesRollup(models.Model):
+    """시간 단위(hour) 또는 일 단위(day)로 집계된 매출.
+
+    주문이 생성되거나 매출 포함 여부가 바뀌는 상태로 변경될 때마다 증분으로 갱신되므로,
+    매출 조회는 주문 내역의 크기와 관계없이 집계 테이블만 읽습니다.
+    `python manage.py rebuild_sales_rollups` 로 주문 내역으로부터 다시 만들 수 있습니다.
+    """
+    HOUR = 'hour'
+    DAY = 'day'
+    GRANULARITIES = (HOUR, DAY)
+
+    @classmethod
+    def bucket_of(cls, granularity: str, value: datetime.datetime) -> datetime.datetime:
+        """일시가 속한 집계 구간의 시작 일시를 반환합니다."""
+        value = timezone.localtime(value).replace(minute=0, second=0, microsecond=0)
+        if granularity == cls.DAY:
+            value = value.replace(hour=0)
+        return value
+
+    @classmethod
+    def record_order(cls, order: Order, items: Iterable[OrderItem], sign: int):
+        """주문 하나를 집계에 더하거나(sign=1) 뺍니다(sign=-1).
+
+        주문 항목의 수와 관계없이 집계 테이블 마다 조회, (없는 행의) 추가, 갱신을 한 번씩만 실행합니다.
+        """
+        groups = _groupby_product(items)
+        totals, products, categories = {}, {}, {}
+        for granularity in cls.GRANULARITIES:
+            bucket = cls.bucket_of(granularity, order.created_at)
+            totals[(granularity, bucket)] = {
+                'revenue': sign * order.total_price,
+                'order_count': sign,
+                'units': sign * order.item_count,
+            }
+            for product_id, product_items in groups.items():
+                products[(granularity, bucket, product_id)] = {
+                    'revenue': sign * sum(item.unit_price * item.quantity for item in product_items),
+                    'order_count': sign,
+                    'units': sign * sum(item.quantity for item in product_items),
+                }
+                categories[(granularity, bucket, product_id)] = {
+                    'category_id': product_items[0].product.category_id,
+                }
+        _increment(cls, ('granularity', 'bucket'), totals)
+        if products:
+            _increment(ProductSalesRollup, ('granularity', 'bucket', 'product_id'), products, categories)
+
+    @classmethod
+    def rebuild(cls):
+        """모든 집계를 지우고 주문 내역으로부터 다시 계산합니다."""
+        excluded = getattr(settings, 'STORE_SALES_EXCLUDED_STATUSES', ())
+        orders = Order.objects.exclude(status__in=excluded)
+        items = OrderItem.objects.filter(order__in=orders)
+        with transaction.atomic():
+            cls.objects.all().delete()
+            ProductSalesRollup.objects.all().delete()
+            for granularity, trunc in ((cls.HOUR, TruncHour), (cls.DAY, TruncDay)):
+                totals = orders.order_by().annotate(bucket=trunc('created_at')).values('bucket').annotate(
+                    revenue_sum=Sum('total_price'),
+                    order_sum=Count('id'),
+                    units_sum=Sum('item_count'),
+                )
+                cls.objects.bulk_create([
+                    cls(granularity=granularity, bucket=row['bucket'], revenue=row['revenue_sum'],
+                        order_count=row['order_sum'], units=row['units_sum'])
+                    for row in totals
+                ], batch_size=500)
+                products = items.order_by().annotate(bucket=trunc('order__created_at')).values(
+                    'bucket', 'product', 'product__category',
+                ).annotate(
+                    revenue_sum=Sum(F('unit_price') * F('quantity')),
+                    order_sum=Count('order', distinct=True),
+                    units_sum=Sum('quantity'),
+                )
+                ProductSalesRollup.objects.bulk_create([
+                    ProductSalesRollup(granularity=granularity, bucket=row['bucket'],
+                                       product_id=row['product'], category_id=row['product__category'],
+                                       revenue=row['revenue_sum'], order_count=row['order_sum'],
+                                       units=row['units_sum'])
+                    for row in products
+                ], batch_size=500)
+
+    @classmethod
+    def query_from_dto(cls, dto: SalesQueryDTO) -> models.query.QuerySet[SalesRollup]:
+        return cls.objects.filter(**dto.filter_kwargs()).order_by('bucket')
+
+    granularity = models.CharField(max_length=4, choices=[(HOUR, HOUR), (DAY, DAY)])
+    bucket = models.DateTimeField()
+    revenue = models.BigIntegerField(default=0)
+    order_count = models.IntegerField(default=0)
+    units = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['granularity', 'bucket'], name='unique_sales_rollup'),
+        ]
+
+
+class ProductSalesRollup(models.Model):
+    """상품 별로 집계된 매출. 카테고리 별 매출은 이 테이블을 카테고리로 묶어서 계산합니다."""
+
+    @classmethod
+    def query_from_dto(cls, dto: SalesQueryDTO) -> models.query.QuerySet[ProductSalesRollup]:
+        return cls.objects.filter(**dto.filter_kwargs())
+
+    @classmethod
+    def summarize(cls, queryset: models.query.QuerySet[ProductSalesRollup], field: str) -> List[dict]:
+        """집계 행들을 field('product' 또는 'category') 별로 합산합니다."""
+        return list(queryset.order_by().values(field, f'{field}__name').annotate(
+            revenue_sum=Sum('revenue'),
+            order_sum=Sum('order_count'),
+            units_sum=Sum('units'),
+        ).order_by('-revenue_sum', field))
+
+    granularity = models.CharField(max_length=4, choices=[(SalesRollup.HOUR, SalesRollup.HOUR),
+                                                          (SalesRollup.DAY, SalesRollup.DAY)])
+    bucket = models.DateTimeField()
+    product = models.ForeignKey(Product, on_delete=models.CASCADE)
+    category = models.ForeignKey(Category, on_delete=models.CASCADE)
+    revenue = models.BigIntegerField(default=0)
+    order_count = models.IntegerField(default=0)
+    units = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['granularity', 'bucket', 'product'],
+                                    name='unique_product_sales_rollup'),
+        ]
+
+
+def _groupby_product(items: Iterable[OrderItem]) -> Dict[int, List[OrderItem]]:
+    groups = {}
+    for item in items:
+        groups.setdefault(item.product_id, []).append(item)
+    return groups
+
+
+def _set_prefetched(entity: models.Model, name: str, objects: List[models.Model]):
+    """이미 불러온 objects 를 prefetch_related 로 불러온 것처럼 entity 의 역참조(name)에 채워, 다시 조회하지 않도록 합니다."""
+    queryset = getattr(entity, name).all()
+    queryset._result_cache = objects
+    queryset._prefetch_done = True
+    entity.__dict__.setdefault('_prefetched_objects_cache', {})[name] = queryset
+
+
+def _increment(model: Type[models.Model], key_fields: Sequence[str], deltas: Dict[tuple, Dict[str, int]],
+               defaults: Optional[Dict[tuple, Dict]] = None):
+    """key_fields 의 값(키)으로 찾은 집계 행들의 값을 키 별 deltas 만큼 증가시킵니다.
+
+    이미 있는 행을 한 번에 조회하고, 없는 행은 0 으로 한 번에 추가한 뒤(동시에 추가된 행은 무시),
+    모든 행을 CASE 문을 사용한 하나의 UPDATE 문으로 증가시킵니다.
+    """
+    lookups = {key: dict(zip(key_fields, key)) for key in deltas}
+    condition = functools.reduce(operator.or_, (Q(**lookup) for lookup in lookups.values()))
+    existing = set(model.objects.filter(condition).values_list(*key_fields))
+    missing = [model(**lookups[key], **(defaults or {}).get(key, {})) for key in deltas if key not in existing]
+    if missing:
+        model.objects.bulk_create(missing, ignore_conflicts=True)
+
+    fields = next(iter(deltas.values())).keys()
+    model.objects.filter(condition).update(**{
+        field: F(field) + Case(
+            *(When(Q(**lookups[key]), then=Value(values[field])) for key, values in deltas.items()),
+            default=Value(0),
+            output_field=model._meta.get_field(field),
+        )
+        for field in fields
+    })
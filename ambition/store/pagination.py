@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import dataclasses
+import json
+from typing import *
+
+from django.db.models import QuerySet
+
+from store.dto import PageQueryDTO
+
+
+@dataclasses.dataclass
+class Page:
+    entities: list
+    next: Optional[str]
+    prev: Optional[str]
+
+    def serialize(self) -> dict:
+        return {
+            "next": self.next,
+            "prev": self.prev,
+        }
+
+
+def encode_cursor(pk: int, backward: bool) -> str:
+    """기준이 되는 pk와 방향을 불투명한 커서 문자열로 만듭니다."""
+    data = json.dumps({'before' if backward else 'after': pk}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(data.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[int, bool]:
+    """커서 문자열로부터 기준 pk와 방향(이전 페이지 여부)을 꺼냅니다.
+
+    :raises ValueError: 커서의 형식이 올바르지 않은 경우에 발생.
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        (key, pk), = data.items()
+    except (binascii.Error, UnicodeError, TypeError, AttributeError, ValueError):
+        raise ValueError('Invalid cursor')
+    if key not in ('after', 'before') or not isinstance(pk, int):
+        raise ValueError('Invalid cursor')
+    return pk, key == 'before'
+
+
+def paginate(queryset: QuerySet, dto: PageQueryDTO) -> Page:
+    """pk를 기준으로 keyset 페이지네이션을 수행합니다.
+
+    OFFSET 을 사용하지 않으므로 몇 번째 페이지든 같은 비용으로 조회되고,
+    조회 도중 새로운 행이 추가되어도 이미 본 행이 다시 나오지 않습니다.
+
+    :raises ValueError: 커서의 형식이 올바르지 않은 경우에 발생.
+    """
+    if dto.cursor is None:
+        pk, backward = None, False
+    else:
+        pk, backward = decode_cursor(dto.cursor)
+
+    if backward:
+        queryset = queryset.filter(pk__lt=pk).order_by('-pk')
+    elif pk is not None:
+        queryset = queryset.filter(pk__gt=pk).order_by('pk')
+    else:
+        queryset = queryset.order_by('pk')
+
+    entities = list(queryset[:dto.limit + 1])
+    has_more = len(entities) > dto.limit
+    entities = entities[:dto.limit]
+    if backward:
+        entities.reverse()
+
+    if not entities:
+        return Page(entities=[], next=None, prev=None)
+    has_next = has_more if not backward else True
+    has_prev = has_more if backward else pk is not None
+    return Page(
+        entities=entities,
+        next=encode_cursor(entities[-1].pk, False) if has_next else None,
+        prev=encode_cursor(entities[0].pk, True) if has_prev else None,
+    )
@@ -0,0 +1,146 @@
+import functools
+import math
+import threading
+import time
+from http import HTTPStatus
+from typing import *
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpRequest, HttpResponse
+
+from store import metrics
+from store.dto import REQUEST_BODY_PARSER
+
+
+class LocalCounterStore:
+    """프로세스 메모리에 만료 시각과 함께 카운터를 저장합니다.
+
+    만료된 카운터는 저장된 키가 max_keys 를 넘을 때 한 번에 정리합니다.
+    """
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> int:
+        counter = self._counters.get(key)
+        if counter is None or counter[1] <= time.time():
+            return 0
+        return counter[0]
+
+    def incr(self, key: str, timeout: float) -> int:
+        now = time.time()
+        with self._lock:
+            counter = self._counters.get(key)
+            if counter is None or counter[1] <= now:
+                if len(self._counters) >= self.max_keys:
+                    self._counters = {k: v for k, v in self._counters.items() if v[1] > now}
+                counter = self._counters[key] = [0, now + timeout]
+            counter[0] += 1
+            return counter[0]
+
+    def clear(self):
+        with self._lock:
+            self._counters.clear()
+
+
+class CacheCounterStore:
+    """Django 캐시에 카운터를 저장합니다. 여러 프로세스가 같은 한도를 공유할 때 사용합니다.
+
+    Redis 나 Memcached 처럼 incr 가 원자적인 캐시를 사용해야 합니다.
+    """
+
+    def get(self, key: str) -> int:
+        return cache.get(key, 0)
+
+    def incr(self, key: str, timeout: float) -> int:
+        cache.add(key, 0, timeout=math.ceil(timeout))
+        try:
+            return cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, timeout=math.ceil(timeout))
+            return 1
+
+    def clear(self):
+        pass
+
+
+local_store = LocalCounterStore()
+cache_store = CacheCounterStore()
+
+
+def get_store():
+    """settings.STORE_RATE_LIMIT 의 BACKEND('local' 또는 'cache')에 해당하는 저장소를 반환합니다."""
+    backend = getattr(settings, 'STORE_RATE_LIMIT', {}).get('BACKEND', 'local')
+    return cache_store if backend == 'cache' else local_store
+
+
+def hit(name: str, identity: str, limit: int, period: int) -> int:
+    """sliding window counter 방식으로 요청을 한 번 기록합니다.
+
+    직전 구간의 요청 수를 현재 구간에서 지난 시간의 비율만큼 줄여서 현재 구간의 요청 수와 더한 값이
+    limit 이상이면 요청을 기록하지 않고, 다시 요청할 수 있을 때까지의 초를 반환합니다.
+    허용되었다면 0을 반환합니다. 키 두 개만 조회하므로 요청 수와 관계없이 일정한 비용이 듭니다.
+    """
+    store = get_store()
+    now = time.time()
+    window, offset = divmod(now, period)
+    key = f'store:ratelimit:{name}:{identity}:{int(window)}'
+    previous = store.get(f'store:ratelimit:{name}:{identity}:{int(window) - 1}')
+    current = store.get(key)
+    fraction = offset / period
+
+    if previous * (1 - fraction) + current < limit:
+        store.incr(key, timeout=period * 2)
+        return 0
+    if current >= limit:
+        return max(1, math.ceil(period - offset))
+    # 직전 구간의 가중치가 (limit - current) / previous 아래로 내려갈 때까지 기다린다.
+    return max(1, math.ceil((1 - (limit - current) / previous - fraction) * period))
+
+
+def client_ip(request: HttpRequest) -> Optional[str]:
+    """요청한 클라이언트의 IP 주소.
+
+    settings.STORE_RATE_LIMIT 의 PROXY_COUNT 만큼의 프록시를 거친다면 X-Forwarded-For 에서 주소를 읽습니다.
+    """
+    proxy_count = getattr(settings, 'STORE_RATE_LIMIT', {}).get('PROXY_COUNT', 0)
+    forwarded = [ip.strip() for ip in request.META.get('HTTP_X_FORWARDED_FOR', '').split(',') if ip.strip()]
+    if proxy_count and len(forwarded) >= proxy_count:
+        return forwarded[-proxy_count]
+    return request.META.get('REMOTE_ADDR')
+
+
+def body_email(request: HttpRequest) -> Optional[str]:
+    """요청 Body 의 email 속성. 없거나 읽을 수 없다면 None 을 반환합니다."""
+    try:
+        return str(REQUEST_BODY_PARSER(request.body)['email']).strip().lower() or None
+    except Exception:
+        return None
+
+
+def rate_limited(name: str, rules: Sequence[Tuple[Callable[[HttpRequest], Optional[str]], int, int]]):
+    """View 메서드의 요청 횟수를 제한하는 데코레이터.
+
+    rules 는 (키 함수, 허용 횟수, 구간(초)) 의 목록이며, 키 함수가 None 을 반환하면 해당 규칙은 건너뜁니다.
+    하나라도 한도를 넘으면 View 를 실행하지 않고 Retry-After 헤더와 함께 429를 반환합니다.
+    """
+    def decorator(view_method):
+        @functools.wraps(view_method)
+        def wrapper(self, request: HttpRequest, *args, **kwargs) -> HttpResponse:
+            if getattr(settings, 'STORE_RATE_LIMIT', {}).get('ENABLED', True):
+                for index, (key_func, limit, period) in enumerate(rules):
+                    identity = key_func(request)
+                    if identity is None:
+                        continue
+                    retry_after = hit(f'{name}:{index}', identity, limit, period)
+                    if retry_after:
+                        metrics.rate_limited.inc(name)
+                        response = HttpResponse(status=HTTPStatus.TOO_MANY_REQUESTS)
+                        response['Retry-After'] = str(retry_after)
+                        return response
+            return view_method(self, request, *args, **kwargs)
+        return wrapper
+    return decorator
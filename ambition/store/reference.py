@@ -0,0 +1,77 @@
+import threading
+import time
+from typing import *
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import models
+
+
+class ReferenceData:
+    """거의 바뀌지 않는 작은 테이블(주문 상태, 카테고리)을 프로세스 메모리에 올려두고 조회합니다.
+
+    처음 조회할 때 테이블 전체를 한 번에 불러오며, 같은 프로세스에서 저장/삭제되면 시그널로 바로 무효화합니다.
+    다른 프로세스에서의 변경은 캐시에 기록된 버전으로 알 수 있으며, 버전은 CHECK_INTERVAL 초에 한 번만 확인합니다.
+    캐시가 공유되지 않거나 버전을 남기지 않은 변경(QuerySet.update 등)도 반영되도록,
+    settings.STORE_PROCESS_CACHE_MAX_AGE 초가 지나면 버전과 관계없이 다시 불러옵니다.
+    반환되는 인스턴스는 여러 요청이 공유하므로 수정하면 안 됩니다.
+    """
+    CHECK_INTERVAL = 5.0
+
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+        self._entities = None
+        self._version = None
+        self._checked_at = 0.0
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def model(self) -> Type[models.Model]:
+        return apps.get_model('store', self.model_name)
+
+    @property
+    def version_key(self) -> str:
+        return f'store:reference:{self.model_name}'
+
+    def all(self) -> Dict[int, models.Model]:
+        """pk 를 키로 하는 모든 인스턴스를 반환합니다."""
+        entities = self._entities
+        now = time.monotonic()
+        max_age = getattr(settings, 'STORE_PROCESS_CACHE_MAX_AGE', 60)
+        if (entities is not None and now - self._checked_at < self.CHECK_INTERVAL
+                and now - self._loaded_at < max_age):
+            return entities
+        with self._lock:
+            version = cache.get(self.version_key)
+            if self._entities is None or version != self._version or now - self._loaded_at >= max_age:
+                self._entities = self.model.objects.in_bulk()
+                self._version = version
+                self._loaded_at = now
+            self._checked_at = now
+            return self._entities
+
+    def get(self, pk: int) -> models.Model:
+        """pk 에 해당하는 인스턴스를 반환합니다. 없다면 한 번 다시 불러온 뒤 확인합니다.
+
+        :raises DoesNotExist: 존재하지 않는 pk 인 경우에 발생.
+        """
+        entity = self.all().get(pk)
+        if entity is None:
+            self.invalidate(broadcast=False)
+            entity = self.all().get(pk)
+            if entity is None:
+                raise self.model.DoesNotExist(f'{self.model_name} not found: {pk}')
+        return entity
+
+    def invalidate(self, broadcast: bool = True):
+        """불러온 인스턴스를 버립니다. broadcast 가 참이면 다른 프로세스도 다시 불러오도록 버전을 바꿉니다."""
+        if broadcast:
+            cache.set(self.version_key, time.time(), timeout=None)
+        with self._lock:
+            self._entities = None
+
+
+categories = ReferenceData('Category')
+order_statuses = ReferenceData('OrderStatus')
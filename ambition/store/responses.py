@@ -0,0 +1,80 @@
+import itertools
+from typing import *
+
+from django.db.models import QuerySet
+from django.http import HttpRequest, HttpResponse, StreamingHttpResponse
+from django.http.response import HttpResponseBase
+
+from store import codec
+
+
+STREAM_CHUNK_SIZE = 500
+
+
+def wants_stream(request: HttpRequest) -> bool:
+    """요청이 스트리밍 응답을 원하는지(stream=true) 확인합니다."""
+    return request.GET.get('stream') == 'true'
+
+
+def iterate_chunks(queryset: QuerySet, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[list]:
+    """QuerySet 을 전부 메모리에 올리지 않고 chunk_size 개씩 나누어 가져옵니다."""
+    iterator = queryset.iterator(chunk_size=chunk_size)
+    while True:
+        chunk = list(itertools.islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class ApiJsonResponse(HttpResponse):
+    """store.codec 으로 data 를 인코딩하는 JSON 응답."""
+
+    def __init__(self, data: Any, **kwargs):
+        kwargs.setdefault('content_type', 'application/json')
+        super().__init__(content=codec.dumps(data), **kwargs)
+
+
+class StreamingJsonListResponse(StreamingHttpResponse):
+    """{"data": {key: [...]}} 형태의 JSON 을 조금씩 나누어 전송하는 응답.
+
+    목록 전체를 메모리에 만들지 않으므로 응답 크기와 관계없이 메모리 사용량이 일정하고,
+    첫 바이트를 더 빨리 보낼 수 있습니다.
+
+    serialize_chunk 는 엔티티 목록을 받아 직렬화된 dict 목록을 반환해야 합니다.
+    """
+
+    def __init__(self, key: str, queryset: QuerySet,
+                 serialize_chunk: Callable[[list], List[dict]],
+                 chunk_size: int = STREAM_CHUNK_SIZE, **kwargs):
+        kwargs.setdefault('content_type', 'application/json')
+        super().__init__(
+            streaming_content=self._generate(key, queryset, serialize_chunk, chunk_size),
+            **kwargs,
+        )
+
+    @staticmethod
+    def _generate(key, queryset, serialize_chunk, chunk_size) -> Iterator[bytes]:
+        yield b'{"data":{' + codec.dumps(key) + b':['
+        separator = b''
+        for chunk in iterate_chunks(queryset, chunk_size):
+            items = [codec.dumps(item) for item in serialize_chunk(chunk)]
+            yield separator + b','.join(items)
+            separator = b','
+        yield b']}}'
+
+
+class AsyncStreamingHttpResponse(HttpResponseBase):
+    """비동기 반복자(async generator 등)의 내용을 이벤트 루프에서 조금씩 보내는 응답.
+
+    Django 3.2 의 StreamingHttpResponse 는 동기 반복자만 지원하여 ASGI 에서도 이벤트 루프를 막으므로,
+    오래 열어두는 응답에 사용합니다. store.asgi.ASGIHandler 로 구동할 때에만 보낼 수 있습니다.
+    """
+    streaming = True
+
+    def __init__(self, streaming_content: AsyncIterator[Union[str, bytes]], *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.streaming_content = streaming_content
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for part in self.streaming_content:
+            yield self.make_bytes(part)
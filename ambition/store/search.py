@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import threading
+from typing import *
+
+from store.caching import get_catalog_version
+
+
+CHOSEONG = 'ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ'
+HANGUL_BEGIN, HANGUL_END = 0xAC00, 0xD7A3
+
+
+def normalize(text: str) -> str:
+    """대소문자와 공백을 무시하도록 문자열을 정규화합니다."""
+    return ''.join(text.lower().split())
+
+
+def choseong(text: str) -> str:
+    """한글 음절을 초성으로 바꿉니다. (예: '아메리카노' -> 'ㅇㅁㄹㅋㄴ') 한글이 아닌 문자는 그대로 둡니다."""
+    return ''.join(
+        CHOSEONG[(ord(char) - HANGUL_BEGIN) // 588] if HANGUL_BEGIN <= ord(char) <= HANGUL_END else char
+        for char in text
+    )
+
+
+def grams(text: str) -> Set[str]:
+    """문자열의 1-gram 과 2-gram 을 반환합니다."""
+    return set(text) | {text[i:i + 2] for i in range(len(text) - 1)}
+
+
+class ProductSearchIndex:
+    """상품 이름의 부분 문자열 검색과 초성 검색을 위한 n-gram 역색인.
+
+    검색어의 2-gram(한 글자라면 1-gram)을 모두 포함하는 상품만 후보로 골라 실제로 포함하는지 확인하므로,
+    상품 수와 관계없이 검색어와 일치하는 상품의 수에 비례하는 시간에 응답합니다.
+    초성(ㄱ-ㅎ)이 포함된 검색어는 상품 이름의 초성과 비교합니다.
+
+    색인은 만들 때의 메뉴 버전을 기억하며, 다른 프로세스에서 메뉴가 바뀌어 버전이 달라지면 다음 검색에서 다시 만듭니다.
+    캐시가 프로세스 메모리(LocMemCache)라면 버전이 STORE_PROCESS_CACHE_MAX_AGE 초마다 만료되므로 그 주기로 다시 만듭니다.
+    같은 프로세스에서 바뀐 상품은 add(), remove() 로 색인에 바로 반영합니다.
+    """
+
+    def __init__(self):
+        self.version = None
+        self._documents = {}
+        self._keys = {}
+        self._postings = {}
+        self._lock = threading.RLock()
+
+    def rebuild(self):
+        """데이터베이스의 모든 상품으로 색인을 다시 만듭니다."""
+        from store.models import Product
+        from store.serializers import serializeProduct
+
+        version = get_catalog_version()
+        with self._lock:
+            self._documents, self._keys, self._postings = {}, {}, {}
+            for entity in Product.objects.all():
+                self._add(entity.pk, entity.name, serializeProduct(entity))
+            self.version = version
+
+    def add(self, pk: int, name: str, document: dict):
+        """상품을 색인에 추가하거나, 이미 있다면 갱신합니다."""
+        with self._lock:
+            if self.version is None:
+                return
+            self._remove(pk)
+            self._add(pk, name, document)
+            self.version = get_catalog_version()
+
+    def remove(self, pk: int):
+        with self._lock:
+            if self.version is None:
+                return
+            self._remove(pk)
+            self.version = get_catalog_version()
+
+    def search(self, query: str, limit: int = 10) -> List[dict]:
+        """이름에 검색어가 포함된 상품을 검색어로 시작하는 상품, 앞쪽에 포함된 상품, 이름이 짧은 상품 순으로 반환합니다."""
+        query = normalize(query)
+        if not query:
+            return []
+        field = 0
+        if any(char in CHOSEONG for char in query):
+            field, query = 1, choseong(query)
+
+        with self._lock:
+            if self.version != get_catalog_version():
+                self.rebuild()
+            if len(query) == 1:
+                candidates = self._postings.get((field, query), set())
+            else:
+                postings = sorted(
+                    (self._postings.get((field, query[i:i + 2]), set()) for i in range(len(query) - 1)),
+                    key=len,
+                )
+                candidates = set.intersection(*postings)
+            matches = []
+            for pk in candidates:
+                key = self._keys[pk][field]
+                position = key.find(query)
+                if position >= 0:
+                    matches.append((position, len(key), key, pk))
+            matches.sort()
+            return [self._documents[pk] for *_, pk in matches[:limit]]
+
+    def _add(self, pk: int, name: str, document: dict):
+        keys = (normalize(name), choseong(normalize(name)))
+        self._documents[pk] = document
+        self._keys[pk] = keys
+        for field, key in enumerate(keys):
+            for gram in grams(key):
+                self._postings.setdefault((field, gram), set()).add(pk)
+
+    def _remove(self, pk: int):
+        keys = self._keys.pop(pk, None)
+        self._documents.pop(pk, None)
+        if keys is None:
+            return
+        for field, key in enumerate(keys):
+            for gram in grams(key):
+                posting = self._postings.get((field, gram))
+                if posting is not None:
+                    posting.discard(pk)
+                    if not posting:
+                        del self._postings[(field, gram)]
+
+
+product_index = ProductSearchIndex()
@@ -1,3 +1,8 @@
+from typing import *
+
+from django.db.models import Prefetch, prefetch_related_objects
+
+from store import reference
 from store.models import *
 
 
@@ -15,18 +20,32 @@ def serializeUser(entity: User) -> dict:
     }
 
 def serializeOrder(entity: Order) -> dict:
-    items = OrderItem.objects.filter(order=entity)
-    total_price = 0
-    for item in items:
-        total_price += item.unit_price * item.quantity
+    return serializeOrders([entity])[0]
+
+def serializeOrders(entities: Iterable[Order]) -> List[dict]:
+    """주문 목록을 주문 수와 관계없이 일정한 개수의 쿼리로 직렬화합니다.
+
+    주문 항목과 상품을 한 번에 불러오며, 주문 상태는 store.reference 에서 조회합니다.
+    """
+    orders = list(entities)
+    prefetch_related_objects(
+        orders,
+        Prefetch('orderitem_set', queryset=OrderItem.objects.select_related('product')),
+    )
+    return [_serializePrefetchedOrder(order) for order in orders]
+
+def _serializePrefetchedOrder(entity: Order) -> dict:
+    items = entity.orderitem_set.all()
+    status = reference.order_statuses.get(entity.status_id)
     return {
         "id": entity.pk,
         "status": {
-            "id": entity.status.pk,
-            "name": entity.status.name,
+            "id": status.pk,
+            "name": status.name,
         },
         "items": list(map(serializeOrderItem, items)),
-        "total_price": total_price,
+        "total_price": entity.total_price,
+        "item_count": entity.item_count,
         "created_at": entity.created_at,
         "updated_at": entity.updated_at,
     }
@@ -44,7 +63,7 @@ def serializeOrderItem(entity: OrderItem) -> dict:
 def serializeProduct(entity: Product) -> dict:
     return {
         "id": entity.pk,
-        "category": serializeCategory(entity.category),
+        "category": serializeCategory(reference.categories.get(entity.category_id)),
         "name": entity.name,
         "image_url": entity.primary_image_url,
         "price": entity.regular_price,
@@ -56,3 +75,23 @@ def serializeCategory(entity: Category) -> dict:
         "id": entity.pk,
         "name": entity.name,
     }
+
+def serializeSalesRollup(entity: SalesRollup) -> dict:
+    return {
+        "bucket": entity.bucket,
+        "revenue": entity.revenue,
+        "order_count": entity.order_count,
+        "units": entity.units,
+    }
+
+def serializeSalesSummary(row: dict, field: str) -> dict:
+    """ProductSalesRollup.summarize 의 결과 행을 직렬화합니다."""
+    return {
+        field: {
+            "id": row[field],
+            "name": row[f'{field}__name'],
+        },
+        "revenue": row['revenue_sum'],
+        "order_count": row['order_sum'],
+        "units": row['units_sum'],
+    }
@@ -0,0 +1,70 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from store import metrics, reference
+from store.caching import bump_catalog_version
+from store.events import order_changed, order_event_hub
+from store.models import *
+from store.search import product_index
+from store.serializers import serializeOrder, serializeProduct
+
+
+@receiver([post_save, post_delete], sender=OrderItem)
+def refresh_order_totals(sender, instance: OrderItem, **kwargs):
+    """주문 항목이 추가/수정/삭제되면 주문의 합계를 다시 계산합니다."""
+    Order.refresh_totals(Order.objects.filter(pk=instance.order_id))
+
+
+@receiver([post_save, post_delete], sender=Product)
+@receiver([post_save, post_delete], sender=Category)
+def invalidate_catalog(sender, **kwargs):
+    """상품이나 카테고리가 바뀌면 캐시된 메뉴 응답을 무효화합니다.
+
+    커밋 전에 다른 요청이 이전 데이터를 새 버전으로 캐시할 수 있으므로 커밋 후에 한 번 더 무효화합니다.
+    """
+    bump_catalog_version()
+    transaction.on_commit(bump_catalog_version)
+
+
+@receiver(post_save, sender=Product)
+def index_product(sender, instance: Product, **kwargs):
+    """저장된 상품을 커밋 후에 검색 색인에 반영합니다."""
+    transaction.on_commit(lambda: product_index.add(instance.pk, instance.name, serializeProduct(instance)))
+
+
+@receiver(post_delete, sender=Product)
+def unindex_product(sender, instance: Product, **kwargs):
+    pk = instance.pk
+    transaction.on_commit(lambda: product_index.remove(pk))
+
+
+@receiver([post_save, post_delete], sender=Category)
+@receiver([post_save, post_delete], sender=OrderStatus)
+def invalidate_reference(sender, **kwargs):
+    """카테고리나 주문 상태가 바뀌면 프로세스에 올려둔 참조 데이터를 무효화합니다.
+
+    커밋 전에 다른 요청이 이전 데이터를 다시 불러올 수 있으므로 커밋 후에 한 번 더 무효화합니다.
+    """
+    data = reference.categories if sender is Category else reference.order_statuses
+    data.invalidate()
+    transaction.on_commit(data.invalidate)
+
+
+@receiver([post_save, post_delete], sender=User)
+def invalidate_user(sender, instance: User, **kwargs):
+    """사용자 정보가 바뀌면 캐시된 사용자를 삭제합니다."""
+    cache.delete(User.cache_key(instance.pk))
+
+
+@receiver(order_changed)
+def publish_order_event(sender, order: Order, created: bool, **kwargs):
+    """주문 변경을 주문 화면들에게 전달합니다. 구독자 수와 관계없이 직렬화는 한 번만 합니다."""
+    order_event_hub.publish('order-created' if created else 'order-updated', serializeOrder(order))
+
+
+@receiver(order_changed)
+def count_created_order(sender, order: Order, created: bool, **kwargs):
+    if created:
+        metrics.orders_created.inc()
@@ -0,0 +1,63 @@
+import gzip
+import io
+from typing import *
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+COMPRESSIBLE_EXTENSIONS = ('.css', '.js', '.mjs', '.map', '.html', '.svg', '.json', '.txt', '.xml', '.ico',
+                           '.ttf', '.otf', '.eot')
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """collectstatic 때 파일 이름에 내용의 해시를 붙이고, 압축할 수 있는 파일은 미리 압축해둡니다.
+
+    각 파일 옆에 gzip(.gz)과 brotli(.br) 파일을 만들며, brotli 는 brotli 패키지가 설치되어 있을 때만 만듭니다.
+    압축해도 MIN_SIZE 바이트보다 작아지지 않는 파일이나 크기가 줄지 않는 파일은 압축하지 않습니다.
+    """
+    MIN_SIZE = 256
+    manifest_strict = False
+
+    def post_process(self, paths, dry_run=False, **options):
+        processed_names = set()
+        for name, hashed_name, processed in super().post_process(paths, dry_run=dry_run, **options):
+            if not isinstance(processed, Exception) and not dry_run:
+                processed_names.update((name, hashed_name) if hashed_name else (name,))
+            yield name, hashed_name, processed
+        if dry_run:
+            return
+        for name in sorted(processed_names):
+            if name.endswith(COMPRESSIBLE_EXTENSIONS):
+                self.compress(name)
+
+    def compress(self, name: str) -> List[str]:
+        """파일의 압축본을 만들고 만든 파일의 이름을 반환합니다."""
+        with self.open(name) as f:
+            content = f.read()
+        if len(content) < self.MIN_SIZE:
+            return []
+        variants = {'.gz': self.gzip(content)}
+        if brotli is not None:
+            variants['.br'] = brotli.compress(content, quality=11)
+        written = []
+        for suffix, compressed in variants.items():
+            if len(compressed) >= len(content):
+                continue
+            if self.exists(name + suffix):
+                self.delete(name + suffix)
+            written.append(self._save(name + suffix, ContentFile(compressed)))
+        return written
+
+    @staticmethod
+    def gzip(content: bytes) -> bytes:
+        buffer = io.BytesIO()
+        # mtime 을 고정하여 같은 파일은 항상 같은 압축본이 되도록 한다.
+        with gzip.GzipFile(filename='', mode='wb', fileobj=buffer, compresslevel=9, mtime=0) as f:
+            f.write(content)
+        return buffer.getvalue()
@@ -1,8 +1,35 @@
+import datetime
+import gzip
+import json
+import os
+import tempfile
+import threading
 from http import HTTPStatus
+from unittest import mock
 
-from django.test import TestCase
+from django.conf import settings
+from django.core import mail
+from django.core.management import call_command
+from django.core.cache import cache
+from django.db import DatabaseError, connection
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.module_loading import import_string
 
-from store.models import Category
+from store import codec, metrics, reference
+from store.asgi import ASGIHandler
+from store.caching import get_catalog_version
+from store.events import OrderEventHub, order_event_hub
+from store.mail import MailQueue, mail_queue
+from store.middleware import QueryStats, fingerprint
+from store.ratelimit import local_store
+from store.models import (Category, EmailValidation, Order, OrderItem, OrderStatus, Product,
+                          ProductSalesRollup, SalesRollup, User)
+from store.responses import AsyncStreamingHttpResponse, StreamingJsonListResponse
+from store.views import CategoryView, async_api_view, async_order_event_view
 
 # Create your tests here.
 
@@ -16,6 +43,1052 @@ class CategoryViewTest(TestCase):
             category.save()
 
     def test_get(self):
-        response = self.client.get('/category')
+        response = self.client.get('/api/v1/category')
         self.assertEqual(response.status_code, HTTPStatus.OK)
         self.assertEqual(len(response.json()['data']['categories']), 3)
+
+    def test_get_stream(self):
+        response = self.client.get('/api/v1/category', {'stream': 'true'})
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertTrue(response.streaming)
+        data = json.loads(b''.join(response.streaming_content))
+        self.assertEqual(len(data['data']['categories']), 3)
+
+
+class AsyncApiViewTest(TransactionTestCase):
+    # 비동기 View 는 다른 스레드의 데이터베이스 연결로 실행되므로, 커밋된 데이터를 사용한다.
+    def setUp(self) -> None:
+        for i in range(3):
+            Category.objects.create(name=f'카테고리 {i}')
+
+    async def test_get(self):
+        view = async_api_view(CategoryView)
+        response = await view(RequestFactory().get('/api/v1/category'))
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(len(json.loads(response.content)['data']['categories']), 3)
+
+    async def test_get_stream(self):
+        view = async_api_view(CategoryView)
+        response = await view(RequestFactory().get('/api/v1/category', {'stream': 'true'}))
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        # 이벤트 루프에서 내용을 읽어도 데이터베이스를 조회하지 않아야 한다.
+        data = json.loads(b''.join(response.streaming_content))
+        self.assertEqual(len(data['data']['categories']), 3)
+
+    async def test_query_stats(self):
+        request = RequestFactory().get('/api/v1/category')
+        request.query_stats = QueryStats()
+        await async_api_view(CategoryView)(request)
+        self.assertGreater(request.query_stats.count, 0)
+
+    async def test_asgi_handler_async_stream(self):
+        async def content():
+            yield 'a'
+            yield 'b'
+
+        messages = []
+
+        async def send(message):
+            messages.append(message)
+
+        await ASGIHandler().send_response(AsyncStreamingHttpResponse(content()), send)
+        self.assertEqual([message.get('body') for message in messages], [None, b'a', b'b', None])
+
+    def test_middleware_async_capable(self):
+        # 동기 전용 미들웨어가 있으면 ASGI 의 모든 요청이 하나의 스레드에서 실행된다.
+        for path in settings.MIDDLEWARE:
+            self.assertTrue(getattr(import_string(path), 'async_capable', False), path)
+        # MiddlewareMixin 은 ASGI 에서 process_request/process_response 를 공유 스레드에서 실행한다.
+        for path in settings.MIDDLEWARE:
+            if path.startswith('store.'):
+                self.assertFalse(issubclass(import_string(path), MiddlewareMixin), path)
+
+
+class OrderViewTest(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.user = User.objects.create(name='관리자', email='admin@example.com', password='password')
+        cls.status = OrderStatus.objects.create(pk=1, name='주문 접수')
+        category = Category.objects.create(name='카테고리')
+        cls.products = [
+            Product.objects.create(category=category, name=f'상품 {i}', primary_image_url='',
+                                   regular_price=1000 * (i + 1), is_soldout=False)
+            for i in range(3)
+        ]
+
+    def setUp(self) -> None:
+        session = self.client.session
+        session[User.SESSION_CURRENT_USER_KEY] = self.user.pk
+        session.save()
+
+    def create_orders(self, count):
+        for _ in range(count):
+            order = Order.objects.create(status=self.status)
+            for product in self.products:
+                OrderItem.objects.create(order=order, product=product,
+                                         unit_price=product.regular_price, quantity=2)
+
+    def count_queries(self, path):
+        cache.clear()
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(path)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        return len(context.captured_queries), response.json()
+
+    def test_get_query_count_is_flat(self):
+        self.create_orders(1)
+        few_queries, data = self.count_queries('/api/v1/order')
+        self.assertEqual(len(data['data']['orders']), 1)
+
+        self.create_orders(9)
+        many_queries, data = self.count_queries('/api/v1/order')
+        self.assertEqual(len(data['data']['orders']), 10)
+        self.assertEqual(few_queries, many_queries)
+
+        order = data['data']['orders'][0]
+        self.assertEqual(order['status']['name'], '주문 접수')
+        self.assertEqual(len(order['items']), 3)
+        self.assertEqual(order['total_price'], 12000)
+
+    def test_get_by_date_range(self):
+        self.create_orders(4)
+        dates = ['2023-01-31T23:59:59+00:00', '2023-02-01T00:00:00+00:00',
+                 '2023-02-14T12:00:00+00:00', '2024-02-14T12:00:00+00:00']
+        for order, date in zip(Order.objects.order_by('pk'), dates):
+            Order.objects.filter(pk=order.pk).update(created_at=date)
+
+        def count(**params):
+            response = self.client.get('/api/v1/order', params)
+            self.assertEqual(response.status_code, HTTPStatus.OK)
+            return len(response.json()['data']['orders'])
+
+        self.assertEqual(count(year=2023), 3)
+        self.assertEqual(count(year=2023, month=2), 2)
+        self.assertEqual(count(year=2023, month=2, day=14), 1)
+        self.assertEqual(count(year=2023, month=1), 1)
+        self.assertEqual(count(**{'from': '2023-02-01'}), 3)
+        self.assertEqual(count(**{'from': '2023-02-01', 'to': '2023-02-14T12:00:00+00:00'}), 1)
+        self.assertEqual(count(year=2024, **{'to': '2024-02-14'}), 0)
+        # 기간의 끝이 9999-12-31 을 넘는 경우
+        self.assertEqual(count(year=9999), 0)
+        self.assertEqual(count(year=9999, month=12), 0)
+        self.assertEqual(count(year=9999, month=12, day=31), 0)
+        self.assertEqual(count(year=9999, month=11), 0)
+
+        for params in ({'month': 2}, {'year': 2023, 'day': 1}, {'year': 2023, 'month': 13},
+                       {'from': 'yesterday'}):
+            response = self.client.get('/api/v1/order', params)
+            self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+
+    def test_get_stream(self):
+        self.create_orders(3)
+        response = self.client.get('/api/v1/order', {'stream': 'true'})
+        self.assertTrue(response.streaming)
+        orders = json.loads(b''.join(response.streaming_content))['data']['orders']
+        self.assertEqual(len(orders), 3)
+        self.assertEqual(orders[0]['total_price'], 12000)
+
+    def test_get_by_id(self):
+        self.create_orders(1)
+        order = Order.objects.get()
+        with self.assertNumQueries(2):
+            response = self.client.get(f'/api/v1/order/{order.pk}')
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(response.json()['data']['order']['id'], order.pk)
+
+    def test_get_by_unknown_id(self):
+        response = self.client.get('/api/v1/order/404')
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+    def test_post_query_count(self):
+        items = [{'product-id': product.pk, 'quantity': 1} for product in self.products] * 4
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post('/api/v1/order', content_type='application/json',
+                                        data={'items': items})
+        self.assertEqual(response.status_code, HTTPStatus.CREATED)
+        self.assertEqual(len(response.json()['data']['order']['items']), 12)
+        queries = [query['sql'] for query in context.captured_queries]
+        self.assertEqual(len([sql for sql in queries if sql.startswith('INSERT INTO "store_order')]), 2)
+        self.assertEqual(len([sql for sql in queries if 'FROM "store_product"' in sql]), 1)
+
+    def test_post_unknown_product(self):
+        response = self.client.post('/api/v1/order', content_type='application/json', data={
+            'items': [
+                {'product-id': self.products[0].pk, 'quantity': 1},
+                {'product-id': 404, 'quantity': 1},
+            ],
+        })
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+        self.assertFalse(Order.objects.exists())
+        self.assertFalse(OrderItem.objects.exists())
+
+    def test_post_stores_totals(self):
+        response = self.client.post('/api/v1/order', content_type='application/json', data={
+            'items': [
+                {'product-id': self.products[0].pk, 'quantity': 2},
+                {'product-id': self.products[2].pk, 'quantity': 1},
+            ],
+        })
+        self.assertEqual(response.status_code, HTTPStatus.CREATED)
+        order = Order.objects.get(pk=response.json()['data']['order']['id'])
+        self.assertEqual(order.total_price, 5000)
+        self.assertEqual(order.item_count, 3)
+
+        item = order.orderitem_set.get(product=self.products[0])
+        item.quantity = 4
+        item.save()
+        order.refresh_from_db()
+        self.assertEqual(order.total_price, 7000)
+        self.assertEqual(order.item_count, 5)
+
+        item.delete()
+        order.refresh_from_db()
+        self.assertEqual(order.total_price, 3000)
+        self.assertEqual(order.item_count, 1)
+
+
+class ProductViewTest(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.category = Category.objects.create(name='카테고리')
+        for i in range(7):
+            Product.objects.create(category=cls.category, name=f'상품 {i}', primary_image_url='',
+                                   regular_price=1000, is_soldout=i % 3 == 0)
+
+    def setUp(self) -> None:
+        cache.clear()
+
+    def get_page(self, **params):
+        response = self.client.get('/api/v1/product', params)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        data = response.json()['data']
+        return [product['name'] for product in data['products']], data['paging']
+
+    def test_get_without_pagination(self):
+        response = self.client.get('/api/v1/product')
+        self.assertEqual(len(response.json()['data']['products']), 7)
+        self.assertNotIn('paging', response.json()['data'])
+
+    def test_get_stream(self):
+        response = self.client.get('/api/v1/product', {'stream': 'true', 'soldout': 'true'})
+        self.assertTrue(response.streaming)
+        products = json.loads(b''.join(response.streaming_content))['data']['products']
+        self.assertEqual([product['name'] for product in products], ['상품 0', '상품 3', '상품 6'])
+
+    def test_stream_in_chunks(self):
+        response = StreamingJsonListResponse('products', Product.objects.order_by('pk'),
+                                             lambda chunk: [{'chunk': len(chunk)} for _ in chunk],
+                                             chunk_size=3)
+        products = json.loads(b''.join(response.streaming_content))['data']['products']
+        self.assertEqual([product['chunk'] for product in products], [3, 3, 3, 3, 3, 3, 1])
+
+    def test_get_with_cursor(self):
+        names, paging = self.get_page(limit=3)
+        self.assertEqual(names, ['상품 0', '상품 1', '상품 2'])
+        self.assertIsNone(paging['prev'])
+
+        Product.objects.create(category=self.category, name='상품 7', primary_image_url='',
+                               regular_price=1000, is_soldout=False)
+        names, paging = self.get_page(limit=3, cursor=paging['next'])
+        self.assertEqual(names, ['상품 3', '상품 4', '상품 5'])
+        next_cursor = paging['next']
+
+        names, paging = self.get_page(limit=3, cursor=paging['prev'])
+        self.assertEqual(names, ['상품 0', '상품 1', '상품 2'])
+        self.assertIsNone(paging['prev'])
+
+        names, paging = self.get_page(limit=3, cursor=next_cursor)
+        self.assertEqual(names, ['상품 6', '상품 7'])
+        self.assertIsNone(paging['next'])
+
+    def test_get_with_cursor_and_filter(self):
+        names, paging = self.get_page(limit=2, soldout='false')
+        self.assertEqual(names, ['상품 1', '상품 2'])
+        names, paging = self.get_page(limit=2, soldout='false', cursor=paging['next'])
+        self.assertEqual(names, ['상품 4', '상품 5'])
+
+    def test_category_from_reference_data(self):
+        self.client.get('/api/v1/product')
+        cache.clear()
+        with self.assertNumQueries(1):
+            self.client.get('/api/v1/product', {'category-id': self.category.pk})
+
+        self.category.name = '새 카테고리'
+        self.category.save()
+        products = self.client.get('/api/v1/product').json()['data']['products']
+        self.assertEqual(products[0]['category']['name'], '새 카테고리')
+        self.assertEqual(self.client.get('/api/v1/product', {'category-id': 999}).status_code,
+                         HTTPStatus.BAD_REQUEST)
+
+    def test_reference_data_max_age(self):
+        reference.categories.invalidate(broadcast=False)
+        reference.categories.all()
+        # QuerySet.update 는 시그널을 보내지 않으므로 다른 프로세스에서의 변경과 같다.
+        Category.objects.filter(pk=self.category.pk).update(name='바뀐 카테고리')
+        self.assertEqual(reference.categories.get(self.category.pk).name, self.category.name)
+        with override_settings(STORE_PROCESS_CACHE_MAX_AGE=0):
+            self.assertEqual(reference.categories.get(self.category.pk).name, '바뀐 카테고리')
+        reference.categories.invalidate(broadcast=False)
+
+    def test_get_with_invalid_cursor(self):
+        for params in ({'cursor': 'invalid'}, {'limit': 0}, {'limit': 'many'}):
+            response = self.client.get('/api/v1/product', params)
+            self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+
+
+class ProductBulkImportTest(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.user = User.objects.create(name='관리자', email='admin@example.com', password='password')
+        cls.category = Category.objects.create(name='커피')
+        cls.product = Product.objects.create(category=cls.category, name='아메리카노', primary_image_url='',
+                                             regular_price=3000, is_soldout=False)
+
+    def setUp(self) -> None:
+        session = self.client.session
+        session[User.SESSION_CURRENT_USER_KEY] = self.user.pk
+        session.save()
+
+    def post(self, body: str, content_type: str):
+        response = self.client.post('/api/v1/product/bulk', content_type=content_type, data=body.encode())
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        return response.json()['data']
+
+    def test_jsonl(self):
+        rows = [
+            {'category-id': self.category.pk, 'name': '카페라떼', 'price': 3500, 'image-url': '', 'soldout': False},
+            {'id': self.product.pk, 'price': 2500},
+            {'category-id': 999, 'name': '녹차', 'price': 3000, 'image-url': '', 'soldout': False},
+            {'name': '빠진 속성'},
+        ]
+        body = '\n'.join(json.dumps(row) for row in rows) + '\n{broken\n'
+        with CaptureQueriesContext(connection) as context:
+            data = self.post(body, 'application/x-ndjson')
+        store_queries = [query for query in context.captured_queries
+                         if 'store_product' in query['sql'] or 'store_category' in query['sql']]
+        self.assertEqual(len(store_queries), 4)
+        self.assertEqual((data['created'], data['updated']), (1, 1))
+        self.assertEqual([error['line'] for error in data['errors']], [3, 4, 5])
+        self.assertEqual(Product.objects.get(name='아메리카노').regular_price, 2500)
+        self.assertTrue(Product.objects.filter(name='카페라떼', category=self.category).exists())
+
+    def test_csv_upsert_by_name(self):
+        body = (
+            'category-id,name,price,image-url,soldout\n'
+            f'{self.category.pk},아메리카노,4000,,true\n'
+            f'{self.category.pk},콜드브루,4500,,false\n'
+            f'{self.category.pk},가격 오류,많이,,false\n'
+        )
+        data = self.post(body, 'text/csv')
+        self.assertEqual((data['created'], data['updated']), (1, 1))
+        self.assertEqual(data['errors'], [{'line': 4, 'message': "invalid literal for int() with base 10: '많이'"}])
+        self.product.refresh_from_db()
+        self.assertEqual((self.product.regular_price, self.product.is_soldout), (4000, True))
+
+    def test_duplicate_name(self):
+        other = Product.objects.create(category=self.category, name='라떼', primary_image_url='',
+                                       regular_price=3000, is_soldout=False)
+        data = self.post(json.dumps({'id': other.pk, 'name': '아메리카노'}), 'application/x-ndjson')
+        self.assertEqual(data['errors'], [{'line': 1, 'message': 'Duplicate name'}])
+
+    def test_too_long(self):
+        rows = [
+            {'category-id': self.category.pk, 'name': '가' * 101, 'price': 3000, 'image-url': '', 'soldout': False},
+            {'id': self.product.pk, 'image-url': 'http://' + 'a' * 200},
+            {'category-id': self.category.pk, 'name': '카페라떼', 'price': 3500, 'image-url': '', 'soldout': False},
+        ]
+        data = self.post('\n'.join(json.dumps(row) for row in rows), 'application/x-ndjson')
+        self.assertEqual((data['created'], data['updated']), (1, 0))
+        self.assertEqual(data['errors'], [
+            {'line': 1, 'message': 'name is too long (max 100)'},
+            {'line': 2, 'message': 'image_url is too long (max 200)'},
+        ])
+
+    def test_fallback_saves_changed_rows_only(self):
+        other = Product.objects.create(category=self.category, name='라떼', primary_image_url='',
+                                       regular_price=3000, is_soldout=False)
+        rows = [
+            {'category-id': self.category.pk, 'name': '카페라떼', 'price': 3500, 'image-url': '', 'soldout': False},
+            {'id': self.product.pk, 'price': 2500},
+            {'id': other.pk, 'price': 3000},
+        ]
+        # bulk_update 가 실패하면 행 단위로 다시 저장한다.
+        with mock.patch('django.db.models.query.QuerySet.bulk_update', side_effect=DatabaseError), \
+                CaptureQueriesContext(connection) as context:
+            data = self.post('\n'.join(json.dumps(row) for row in rows), 'application/x-ndjson')
+        self.assertEqual((data['created'], data['updated'], data['errors']), (1, 1, []))
+        updates = [query['sql'] for query in context.captured_queries
+                   if query['sql'].startswith('UPDATE "store_product"')]
+        self.assertEqual(len(updates), 1)
+        self.assertTrue(updates[0].startswith('UPDATE "store_product" SET "regular_price" = 2500 WHERE'))
+        self.assertTrue(Product.objects.filter(name='카페라떼').exists())
+        self.assertEqual(Product.objects.get(pk=self.product.pk).regular_price, 2500)
+
+    def test_invalid_utf8(self):
+        response = self.client.post('/api/v1/product/bulk', content_type='text/csv',
+                                    data='category-id,name\n'.encode() + b'1,\xff\xfe\n')
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+
+
+class ProductSearchTest(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.category = Category.objects.create(name='커피')
+        for name in ('아메리카노', '아이스 아메리카노', '카페라떼', 'Cold Brew'):
+            Product.objects.create(category=cls.category, name=name, primary_image_url='',
+                                   regular_price=3000, is_soldout=False)
+
+    def setUp(self) -> None:
+        cache.clear()
+
+    def search(self, query, **params):
+        response = self.client.get('/api/v1/product/search', {'q': query, **params})
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        return [product['name'] for product in response.json()['data']['products']]
+
+    def test_substring(self):
+        self.assertEqual(self.search('메리카'), ['아메리카노', '아이스 아메리카노'])
+        self.assertEqual(self.search('cold b'), ['Cold Brew'])
+        self.assertEqual(self.search('라'), ['카페라떼'])
+        self.assertEqual(self.search('녹차'), [])
+
+    def test_choseong(self):
+        self.assertEqual(self.search('ㅇㅁㄹ'), ['아메리카노', '아이스 아메리카노'])
+        self.assertEqual(self.search('카ㅍ'), ['카페라떼'])
+        self.assertEqual(self.search('ㅇ', limit=1), ['아메리카노'])
+
+    def test_incremental_update(self):
+        self.search('라떼')
+        with self.assertNumQueries(0):
+            self.search('라떼')
+        with self.captureOnCommitCallbacks(execute=True):
+            Product.objects.create(category=self.category, name='바닐라 라떼', primary_image_url='',
+                                   regular_price=4000, is_soldout=False)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.search('라떼'), ['카페라떼', '바닐라 라떼'])
+
+    def test_invalid_query(self):
+        self.assertEqual(self.client.get('/api/v1/product/search').status_code, HTTPStatus.BAD_REQUEST)
+        self.assertEqual(self.client.get('/api/v1/product/search', {'q': 'a', 'limit': 0}).status_code,
+                         HTTPStatus.BAD_REQUEST)
+
+
+class CatalogCacheTest(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.category = Category.objects.create(name='카테고리')
+        Product.objects.create(category=cls.category, name='상품', primary_image_url='',
+                               regular_price=1000, is_soldout=False)
+
+    def setUp(self) -> None:
+        cache.clear()
+
+    def test_cache_hit_skips_database(self):
+        response = self.client.get('/api/v1/product', {'soldout': 'false'})
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        with self.assertNumQueries(0):
+            cached = self.client.get('/api/v1/product', {'soldout': 'false'})
+        self.assertEqual(cached.content, response.content)
+        self.assertEqual(cached['ETag'], response['ETag'])
+
+    def test_not_modified(self):
+        response = self.client.get('/api/v1/category')
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/v1/category', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+
+    def test_write_invalidates(self):
+        etag = self.client.get('/api/v1/product')['ETag']
+        Product.objects.create(category=self.category, name='새 상품', primary_image_url='',
+                               regular_price=1000, is_soldout=False)
+        response = self.client.get('/api/v1/product', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(len(response.json()['data']['products']), 2)
+
+
+    def test_local_cache_version_expires(self):
+        # 프로세스 메모리의 캐시는 다른 프로세스의 변경을 알 수 없으므로 메뉴 버전이 만료되어야 한다.
+        version = get_catalog_version()
+        self.assertEqual(get_catalog_version(), version)
+        with override_settings(STORE_PROCESS_CACHE_MAX_AGE=0):
+            cache.clear()
+            version = get_catalog_version()
+            self.assertNotEqual(get_catalog_version(), version)
+
+
+class CurrentUserTest(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.user = User.objects.create(name='관리자', email='admin@example.com', password='password')
+
+    def setUp(self) -> None:
+        cache.clear()
+        session = self.client.session
+        session[User.SESSION_CURRENT_USER_KEY] = self.user.pk
+        session.save()
+
+    def user_queries(self, path):
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(path)
+        return [query for query in context.captured_queries if 'store_user' in query['sql']]
+
+    def test_resolved_once_and_cached(self):
+        self.assertEqual(len(self.user_queries('/api/v1/order')), 1)
+        self.assertEqual(len(self.user_queries('/api/v1/order')), 0)
+
+    def test_invalidated_on_save(self):
+        self.user_queries('/api/v1/order')
+        self.user.name = '새 이름'
+        self.user.save()
+        self.assertEqual(len(self.user_queries('/api/v1/order')), 1)
+
+    def test_session_read_from_cache(self):
+        self.client.get('/api/v1/order')
+        with CaptureQueriesContext(connection) as context:
+            self.client.get('/api/v1/order')
+        self.assertFalse([query for query in context.captured_queries if 'django_session' in query['sql']])
+
+    @override_settings(SESSION_ENGINE='django.contrib.sessions.backends.signed_cookies',
+                       STORE_RATE_LIMIT={'ENABLED': False})
+    def test_signed_cookie_session(self):
+        self.client.cookies.clear()
+        self.client.post('/api/v1/login', content_type='application/json',
+                         data={'email': self.user.email, 'password': self.user.password})
+        response = self.client.get('/api/v1/order')
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.client.get('/api/v1/logout')
+        self.assertEqual(self.client.get('/api/v1/order').status_code, HTTPStatus.UNAUTHORIZED)
+
+
+class EmailValidationViewTest(TestCase):
+    def setUp(self) -> None:
+        local_store.clear()
+
+    def test_post_queues_email(self):
+        response = self.client.post('/api/v1/email/validation', content_type='application/json',
+                                    data={'email': 'user@example.com'})
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        mail_queue.join()
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['user@example.com'])
+        self.assertIn(EmailValidation.objects.get().codes, mail.outbox[0].body)
+
+    def signup(self, code: str):
+        return self.client.post('/api/v1/signup', content_type='application/json', data={
+            'email': 'user@example.com', 'password': 'pw', 'name': '사용자', 'validation-code': code,
+        })
+
+    def test_code_used_once(self):
+        EmailValidation.objects.create(email='user@example.com', codes='ABCDE')
+        self.assertEqual(self.signup('ABCDF').status_code, HTTPStatus.UNAUTHORIZED)
+        self.assertEqual(self.signup('ABCDE').status_code, HTTPStatus.CREATED)
+        self.assertFalse(EmailValidation.objects.exists())
+
+    def test_expired_code(self):
+        EmailValidation.objects.create(email='user@example.com', codes='ABCDE')
+        EmailValidation.objects.update(created_at=timezone.now() - datetime.timedelta(hours=1))
+        self.assertEqual(self.signup('ABCDE').status_code, HTTPStatus.UNAUTHORIZED)
+        self.assertEqual(EmailValidation.sweep(), 1)
+
+
+class RateLimitTest(TestCase):
+    def setUp(self) -> None:
+        local_store.clear()
+
+    def post_email(self, email: str, ip: str = '10.0.0.1'):
+        return self.client.post('/api/v1/email/validation', content_type='application/json',
+                                data={'email': email}, REMOTE_ADDR=ip)
+
+    def test_limit_by_email(self):
+        for _ in range(3):
+            self.assertEqual(self.post_email('user@example.com').status_code, HTTPStatus.OK)
+        response = self.post_email('USER@example.com', ip='10.0.0.2')
+        self.assertEqual(response.status_code, HTTPStatus.TOO_MANY_REQUESTS)
+        self.assertGreater(int(response['Retry-After']), 0)
+        self.assertEqual(self.post_email('other@example.com').status_code, HTTPStatus.OK)
+
+    def test_limit_by_ip(self):
+        for i in range(30):
+            self.client.post('/api/v1/login', content_type='application/json',
+                             data={'email': f'user{i}@example.com', 'password': 'x'}, REMOTE_ADDR='10.0.0.1')
+        response = self.client.post('/api/v1/login', content_type='application/json',
+                                    data={'email': 'user@example.com', 'password': 'x'}, REMOTE_ADDR='10.0.0.1')
+        self.assertEqual(response.status_code, HTTPStatus.TOO_MANY_REQUESTS)
+
+    @override_settings(STORE_RATE_LIMIT={'ENABLED': False})
+    def test_disabled(self):
+        for _ in range(5):
+            self.assertEqual(self.post_email('user@example.com').status_code, HTTPStatus.OK)
+
+
+class MailQueueTest(TestCase):
+    class FlakyConnection:
+        failures = 0
+
+        def open(self):
+            pass
+
+        def close(self):
+            pass
+
+        def send_messages(self, messages):
+            if MailQueueTest.FlakyConnection.failures > 0:
+                MailQueueTest.FlakyConnection.failures -= 1
+                raise ConnectionError()
+            mail.outbox.extend(messages)
+            return len(messages)
+
+    def test_retry(self):
+        queue = MailQueue(workers=1, max_retries=2, backoff=0, connection_factory=self.FlakyConnection)
+        self.FlakyConnection.failures = 2
+        with self.assertLogs('store.mail', level='WARNING'):
+            queue.enqueue(mail.EmailMessage(to=['first@example.com']))
+            queue.join()
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(queue.sent_count, 1)
+
+        self.FlakyConnection.failures = 3
+        with self.assertLogs('store.mail', level='WARNING'):
+            queue.enqueue(mail.EmailMessage(to=['second@example.com']))
+            queue.join()
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(queue.failed_count, 1)
+        self.assertEqual(queue.depth(), 0)
+
+    def test_batch_retries_failed_messages_only(self):
+        batches = []
+        failures = {'second@example.com'}
+
+        class PartialConnection(self.FlakyConnection):
+            def send_messages(self, messages):
+                batches.append([message.to[0] for message in messages[:]])
+                for message in messages:
+                    if message.to[0] in failures:
+                        failures.discard(message.to[0])
+                        raise ConnectionError()
+                    mail.outbox.append(message)
+                return len(messages)
+
+        queue = MailQueue(workers=1, backoff=0, connection_factory=PartialConnection)
+        recipients = ['first@example.com', 'second@example.com', 'third@example.com']
+        with self.assertLogs('store.mail', level='WARNING'):
+            queue._send_batch(None, [mail.EmailMessage(to=[to]) for to in recipients])
+        self.assertEqual(batches, [recipients, recipients[1:]])
+        self.assertEqual([message.to[0] for message in mail.outbox], recipients)
+        self.assertEqual(queue.sent_count, 3)
+
+
+@override_settings(STORE_SALES_EXCLUDED_STATUSES=[3])
+class SalesRollupTest(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.user = User.objects.create(name='관리자', email='admin@example.com', password='password')
+        for name in ('주문 접수', '완료', '취소'):
+            OrderStatus.objects.create(name=name)
+        cls.categories = [Category.objects.create(name=f'카테고리 {i}') for i in range(2)]
+        cls.products = [
+            Product.objects.create(category=cls.categories[i % 2], name=f'상품 {i}', primary_image_url='',
+                                   regular_price=1000 * (i + 1), is_soldout=False)
+            for i in range(3)
+        ]
+
+    def setUp(self) -> None:
+        session = self.client.session
+        session[User.SESSION_CURRENT_USER_KEY] = self.user.pk
+        session.save()
+
+    def order(self, *quantities):
+        items = [{'product-id': product.pk, 'quantity': quantity}
+                 for product, quantity in zip(self.products, quantities) if quantity]
+        response = self.client.post('/api/v1/order', content_type='application/json', data={'items': items})
+        return response.json()['data']['order']['id']
+
+    def snapshot(self):
+        return (
+            sorted(SalesRollup.objects.values_list('granularity', 'bucket', 'revenue', 'order_count', 'units')),
+            sorted(ProductSalesRollup.objects.values_list(
+                'granularity', 'bucket', 'product', 'category', 'revenue', 'order_count', 'units')),
+        )
+
+    def test_incremental_matches_rebuild(self):
+        self.order(1, 2, 0)
+        self.order(0, 1, 3)
+        cancelled = self.order(2, 0, 0)
+        response = self.client.patch(f'/api/v1/order/{cancelled}', content_type='application/json',
+                                     data={'status': 3})
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+
+        day = SalesRollup.objects.get(granularity=SalesRollup.DAY)
+        self.assertEqual((day.revenue, day.order_count, day.units), (16000, 2, 7))
+
+        incremental = self.snapshot()
+        SalesRollup.rebuild()
+        self.assertEqual(self.snapshot(), incremental)
+
+    def test_rollup_queries(self):
+        for expected in (6, 4):
+            with CaptureQueriesContext(connection) as context:
+                self.order(1, 2, 3)
+            rollup_queries = [query['sql'] for query in context.captured_queries if 'salesrollup' in query['sql']]
+            self.assertEqual(len(rollup_queries), expected, rollup_queries)
+
+    def test_bulk_update(self):
+        first, second, third = self.order(1, 0, 0), self.order(0, 1, 0), self.order(0, 0, 1)
+        self.client.patch(f'/api/v1/order/{third}', content_type='application/json', data={'status': 3})
+        with CaptureQueriesContext(connection) as context:
+            with self.captureOnCommitCallbacks(execute=True) as callbacks:
+                response = self.client.patch('/api/v1/order/bulk', content_type='application/json',
+                                             data={'ids': [first, second, third, 999], 'status': 3})
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        data = response.json()['data']
+        self.assertEqual([row['result'] for row in data['results']], ['updated', 'updated', 'unchanged', 'not_found'])
+        self.assertEqual(sorted(order['id'] for order in data['orders']), [first, second])
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(len([query for query in context.captured_queries
+                              if query['sql'].startswith('UPDATE "store_order"')]), 1)
+
+        day = SalesRollup.objects.get(granularity=SalesRollup.DAY)
+        self.assertEqual((day.revenue, day.order_count), (0, 0))
+        incremental = self.snapshot()
+        SalesRollup.rebuild()
+        self.assertEqual(self.snapshot()[0], [row for row in incremental[0] if row[3]])
+
+        response = self.client.patch('/api/v1/order/bulk', content_type='application/json',
+                                     data={'ids': [first], 'status': 99})
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+
+    def test_get(self):
+        self.order(1, 2, 0)
+        self.order(0, 1, 3)
+        response = self.client.get('/api/v1/sales', {'granularity': 'hour'})
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        data = response.json()['data']
+        self.assertEqual(len(data['sales']), 1)
+        self.assertEqual(data['sales'][0]['revenue'], 16000)
+        self.assertEqual([row['product']['name'] for row in data['products']], ['상품 2', '상품 1', '상품 0'])
+        self.assertEqual([row['units'] for row in data['products']], [3, 3, 1])
+        self.assertEqual({row['category']['name']: row['revenue'] for row in data['categories']},
+                         {'카테고리 0': 10000, '카테고리 1': 6000})
+
+        self.assertEqual(self.client.get('/api/v1/sales', {'granularity': 'week'}).status_code,
+                         HTTPStatus.BAD_REQUEST)
+
+
+class OrderStatusTransitionTest(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.user = User.objects.create(name='관리자', email='admin@example.com', password='password')
+        for name in ('주문 접수', '조리 중', '조리 완료', '주문 취소'):
+            OrderStatus.objects.create(name=name)
+        cls.order = Order.objects.create(status_id=1, total_price=1000, item_count=1)
+        product = Product.objects.create(category=Category.objects.create(name='카테고리'), name='상품',
+                                         primary_image_url='', regular_price=1000, is_soldout=False)
+        OrderItem.objects.create(order=cls.order, product=product, unit_price=1000, quantity=1)
+
+    def setUp(self) -> None:
+        cache.clear()
+        session = self.client.session
+        session[User.SESSION_CURRENT_USER_KEY] = self.user.pk
+        session.save()
+
+    def patch(self, order_id, status):
+        return self.client.patch(f'/api/v1/order/{order_id}', content_type='application/json',
+                                 data={'status': status})
+
+    def test_transitions(self):
+        with CaptureQueriesContext(connection) as context:
+            self.assertEqual(self.patch(self.order.pk, 2).status_code, HTTPStatus.OK)
+        updates = [query['sql'] for query in context.captured_queries if query['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 1)
+        self.assertIn('"updated_at"', updates[0])
+        # 변경 후에는 주문 항목과 함께 주문을 한 번만 불러온다.
+        selects = [query['sql'] for query in context.captured_queries
+                   if query['sql'].startswith('SELECT') and '"store_order"' in query['sql']]
+        self.assertEqual(len(selects), 1)
+        self.assertIn('FROM "store_orderitem"', selects[0])
+        order = self.patch(self.order.pk, 2).json()['data']['order']
+        self.assertEqual((order['status']['id'], len(order['items'])), (2, 1))
+
+        self.assertEqual(self.patch(self.order.pk, 2).status_code, HTTPStatus.OK)
+        self.assertEqual(self.patch(self.order.pk, 3).status_code, HTTPStatus.OK)
+        self.assertEqual(self.patch(self.order.pk, 4).status_code, HTTPStatus.CONFLICT)
+        self.assertEqual(self.patch(self.order.pk, 1).status_code, HTTPStatus.CONFLICT)
+        self.assertEqual(Order.objects.get().status_id, 3)
+
+    def test_not_found(self):
+        self.assertEqual(self.patch(999, 2).status_code, HTTPStatus.NOT_FOUND)
+        # 존재하지 않는 상태는 주문/일괄 수정과 같이 400 으로 응답한다.
+        response = self.patch(self.order.pk, 99)
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+        self.assertEqual(response.json(), {'message': 'Status not found'})
+
+    def test_bulk_conflict(self):
+        other = Order.objects.create(status_id=3)
+        response = self.client.patch('/api/v1/order/bulk', content_type='application/json',
+                                     data={'ids': [self.order.pk, other.pk], 'status': 4})
+        self.assertEqual([row['result'] for row in response.json()['data']['results']], ['updated', 'conflict'])
+
+
+class OrderEventTest(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.user = User.objects.create(name='관리자', email='admin@example.com', password='password')
+        OrderStatus.objects.create(pk=1, name='주문 접수')
+        OrderStatus.objects.create(pk=2, name='완료')
+        category = Category.objects.create(name='카테고리')
+        cls.product = Product.objects.create(category=category, name='상품', primary_image_url='',
+                                             regular_price=1000, is_soldout=False)
+
+    def setUp(self) -> None:
+        session = self.client.session
+        session[User.SESSION_CURRENT_USER_KEY] = self.user.pk
+        session.save()
+
+    def create_order(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/v1/order', content_type='application/json',
+                                        data={'items': [{'product-id': self.product.pk, 'quantity': 1}]})
+        return response.json()['data']['order']['id']
+
+    def test_stream(self):
+        last_id = order_event_hub.last_id
+        order_id = self.create_order()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(f'/api/v1/order/{order_id}', content_type='application/json', data={'status': 2})
+
+        response = self.client.get('/api/v1/order/events', HTTP_LAST_EVENT_ID=str(last_id))
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        stream = iter(response.streaming_content)
+        self.assertEqual(next(stream), b'retry: 3000\n\n')
+        created, updated = next(stream).decode(), next(stream).decode()
+        self.assertIn('event: order-created', created)
+        self.assertEqual(json.loads(created.split('data: ')[1])['id'], order_id)
+        self.assertIn('event: order-updated', updated)
+        self.assertEqual(json.loads(updated.split('data: ')[1])['status']['name'], '완료')
+        response.close()
+
+    def test_poll(self):
+        last_id = order_event_hub.last_id
+        order_id = self.create_order()
+        response = self.client.get('/api/v1/order/events', {'mode': 'poll', 'last-event-id': last_id})
+        data = response.json()['data']
+        self.assertFalse(data['reset'])
+        self.assertEqual([event['order']['id'] for event in data['events']], [order_id])
+        self.assertEqual(data['last_event_id'], last_id + 1)
+
+        response = self.client.get('/api/v1/order/events', {'mode': 'poll', 'last-event-id': last_id + 100})
+        self.assertTrue(response.json()['data']['reset'])
+
+    def async_request(self, **params):
+        request = RequestFactory().get('/api/v1/order/events', params)
+        setattr(request, User.REQUEST_CURRENT_USER_ATTR, self.user)
+        return request
+
+    async def test_stream_async(self):
+        last_id = order_event_hub.last_id
+        response = await async_order_event_view(self.async_request(**{'last-event-id': last_id}))
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        stream = response.__aiter__()
+        self.assertEqual(await stream.__anext__(), b'retry: 3000\n\n')
+        threading.Timer(0.05, order_event_hub.publish, ('order-created', {'id': 1})).start()
+        self.assertIn(b'event: order-created', await stream.__anext__())
+        await stream.aclose()
+
+    async def test_poll_async(self):
+        last_id = order_event_hub.last_id
+        threading.Timer(0.05, order_event_hub.publish, ('order-created', {'id': 1})).start()
+        response = await async_order_event_view(self.async_request(mode='poll', **{'last-event-id': last_id}))
+        data = json.loads(response.content)['data']
+        self.assertEqual([event['order']['id'] for event in data['events']], [1])
+        self.assertEqual(data['last_event_id'], last_id + 1)
+
+    def test_hub_history(self):
+        hub = OrderEventHub(history=2)
+        for i in range(3):
+            hub.publish('order-created', {'id': i})
+        self.assertIsNone(hub.wait(0, timeout=0))
+        self.assertEqual([event.data['id'] for event in hub.wait(1, timeout=0)], [1, 2])
+        self.assertEqual(hub.wait(3, timeout=0), [])
+
+
+class CodecTest(TestCase):
+    def test_codecs_agree(self):
+        data = {
+            'name': '상품',
+            'created_at': datetime.datetime(2023, 7, 13, 12, 30, 15, 123456, tzinfo=datetime.timezone.utc),
+            'items': [1, 2.5, None, True],
+        }
+        for name in codec.CODECS:
+            instance = codec.create_codec(name)
+            decoded = instance.loads(instance.dumps(data))
+            self.assertEqual(decoded['name'], '상품')
+            self.assertEqual(decoded['items'], [1, 2.5, None, True])
+            self.assertEqual(parse_datetime(decoded['created_at']).replace(microsecond=0),
+                             data['created_at'].replace(microsecond=0))
+
+    def test_datetime_format(self):
+        # orjson 이 설치되어 있는지에 따라 응답의 시각 형식이 달라지지 않아야 한다.
+        data = {
+            'utc': datetime.datetime(2023, 7, 13, 12, 30, 15, 123456, tzinfo=datetime.timezone.utc),
+            'kst': datetime.datetime(2023, 7, 13, 21, 30, 15, 123456,
+                                     tzinfo=datetime.timezone(datetime.timedelta(hours=9))),
+            'date': datetime.date(2023, 7, 13),
+        }
+        expected = ('{"utc":"2023-07-13T12:30:15.123Z","kst":"2023-07-13T21:30:15.123+09:00",'
+                    '"date":"2023-07-13"}').encode()
+        for name in codec.CODECS:
+            self.assertEqual(codec.create_codec(name).dumps(data), expected, name)
+
+    def test_invalid_body(self):
+        response = self.client.post('/api/v1/order', content_type='application/json', data='{"items": [')
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+
+
+@override_settings(STORE_QUERY_ACCOUNTING={'SAMPLE_RATE': 1.0})
+class QueryAccountingMiddlewareTest(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        for i in range(3):
+            Category.objects.create(name=f'카테고리 {i}')
+
+    def setUp(self) -> None:
+        cache.clear()
+
+    def test_server_timing(self):
+        response = self.client.get('/api/v1/category')
+        self.assertRegex(response['Server-Timing'], r'^db;dur=[\d.]+;desc="\d+ queries", app;dur=[\d.]+$')
+
+    @override_settings(STORE_QUERY_ACCOUNTING={'SAMPLE_RATE': 1.0, 'MAX_QUERIES': 0})
+    def test_logs_over_budget(self):
+        with self.assertLogs('store.middleware', level='WARNING') as logs:
+            self.client.get('/api/v1/category')
+        self.assertIn('GET /api/v1/category: 1 queries', logs.output[0])
+        self.assertIn('FROM "store_category"', logs.output[0])
+
+    @override_settings(STORE_QUERY_ACCOUNTING={
+        'SAMPLE_RATE': 1.0, 'MAX_QUERIES': 0, 'ROUTES': {'api/v1/category': {'MAX_QUERIES': None}},
+    })
+    def test_route_budget(self):
+        with self.assertLogs('store.middleware', level='WARNING') as logs:
+            self.client.get('/api/v1/category')
+            self.client.get('/api/v1/product')
+        self.assertEqual(len(logs.output), 1)
+        self.assertIn('GET /api/v1/product', logs.output[0])
+
+    @override_settings(STORE_QUERY_ACCOUNTING={'SAMPLE_RATE': 0.0})
+    def test_sampling(self):
+        self.assertNotIn('Server-Timing', self.client.get('/api/v1/category'))
+
+    def test_fingerprint(self):
+        self.assertEqual(
+            fingerprint("SELECT * FROM t WHERE id IN (%s, %s, %s) AND name = 'x''y' LIMIT 21"),
+            'SELECT * FROM t WHERE id IN (...) AND name = ? LIMIT ?',
+        )
+
+
+class MetricsTest(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+
+    def test_route_metrics(self):
+        self.client.get('/api/v1/category')
+        body = self.client.get('/metrics').content.decode()
+        self.assertIn('http_requests_total{route="api/v1/category",method="GET",status="200"}', body)
+        self.assertIn('http_request_duration_seconds_bucket{route="api/v1/category",method="GET",le="+Inf"}', body)
+        self.assertIn('store_cache_requests_total{cache="catalog",result="miss"}', body)
+
+    def test_histogram(self):
+        histogram = metrics.Histogram('latency', 'help', ['route'], buckets=(0.1, 1.0))
+        registry = metrics.Registry()
+        registry.register(histogram)
+        for value in (0.05, 0.5, 0.5, 5.0):
+            histogram.observe(value, 'a')
+        body = registry.render()
+        self.assertIn('latency_bucket{route="a",le="0.1"} 1', body)
+        self.assertIn('latency_bucket{route="a",le="1.0"} 3', body)
+        self.assertIn('latency_bucket{route="a",le="+Inf"} 4', body)
+        self.assertIn('latency_sum{route="a"} 6.05', body)
+        self.assertIn('latency_count{route="a"} 4', body)
+
+    def test_multiprocess(self):
+        with tempfile.TemporaryDirectory() as directory, self.settings(STORE_METRICS_DIR=directory):
+            registry = metrics.Registry()
+            counter = registry.counter('orders', 'help')
+            counter.inc(amount=2)
+            registry.gauge('depth', 'help', lambda: 1)
+            # 살아있는 프로세스(부모)와 종료된 프로세스(존재할 수 없는 pid)의 파일
+            for pid, orders, depth in ((os.getppid(), 3, 4), (2 ** 30, 5, 6)):
+                with open(f'{directory}/{pid}-1.json', 'w') as f:
+                    json.dump({
+                        'orders': {'type': 'counter', 'help': 'help', 'labelnames': [], 'buckets': [],
+                                   'samples': {'[]': orders}},
+                        'depth': {'type': 'gauge', 'help': 'help', 'labelnames': [], 'buckets': [],
+                                  'samples': {'[]': depth}},
+                    }, f)
+            body = registry.render()
+            self.assertIn('orders 10', body)
+            self.assertIn('depth 5', body)
+
+    def test_flusher_restarts_after_fork(self):
+        with tempfile.TemporaryDirectory() as directory, self.settings(STORE_METRICS_DIR=directory), \
+                mock.patch.object(metrics.Registry, '_flush_forever'):
+            registry = metrics.Registry()
+            registry.start()
+            parent = registry._flusher
+            registry.start()
+            self.assertIs(registry._flusher, parent)
+            # fork 된 자식 프로세스는 부모의 _flusher 를 물려받지만 스레드는 실행되지 않는다.
+            with mock.patch('os.getpid', return_value=os.getpid() + 1):
+                registry.start()
+            self.assertIsNot(registry._flusher, parent)
+            self.assertEqual(registry._flusher_pid, os.getpid() + 1)
+
+    def test_allowed_ips(self):
+        self.assertEqual(self.client.get('/metrics').status_code, HTTPStatus.OK)
+        with self.settings(STORE_METRICS_ALLOWED_IPS=['10.0.0.0/8']):
+            self.assertEqual(self.client.get('/metrics').status_code, HTTPStatus.FORBIDDEN)
+            self.assertEqual(self.client.get('/metrics', REMOTE_ADDR='10.1.2.3').status_code, HTTPStatus.OK)
+
+
+class StaticFilesTest(TestCase):
+    def setUp(self) -> None:
+        self.source = tempfile.TemporaryDirectory()
+        self.root = tempfile.TemporaryDirectory()
+        self.addCleanup(self.source.cleanup)
+        self.addCleanup(self.root.cleanup)
+        with open(os.path.join(self.source.name, 'app.css'), 'w') as f:
+            f.write('body { color: black; }\n' * 100)
+        settings = override_settings(STATIC_ROOT=self.root.name, STATICFILES_DIRS=[self.source.name],
+                                     INSTALLED_APPS=['django.contrib.staticfiles', 'store'])
+        settings.enable()
+        self.addCleanup(settings.disable)
+        call_command('collectstatic', interactive=False, verbosity=0)
+        with open(os.path.join(self.root.name, 'staticfiles.json')) as f:
+            self.hashed_name = json.load(f)['paths']['app.css']
+
+    def test_precompressed(self):
+        self.assertTrue(os.path.exists(os.path.join(self.root.name, self.hashed_name + '.gz')))
+        response = self.client.get(f'/static/{self.hashed_name}', HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Content-Type'], 'text/css')
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(gzip.decompress(b''.join(response.streaming_content)).decode(),
+                         'body { color: black; }\n' * 100)
+
+    def test_unhashed(self):
+        response = self.client.get('/static/app.css')
+        self.assertNotIn('Content-Encoding', response)
+        self.assertEqual(response['Cache-Control'], 'public, max-age=60')
+        response.close()
+        response = self.client.get('/static/app.css', HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+
+    def test_api_compression(self):
+        for i in range(30):
+            Category.objects.create(name=f'카테고리 {i}')
+        response = self.client.get('/api/v1/category', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(len(json.loads(gzip.decompress(response.content))['data']['categories']), 30)
+        self.assertNotIn('Content-Encoding', self.client.get('/api/v1/product', HTTP_ACCEPT_ENCODING='gzip'))
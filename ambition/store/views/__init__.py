@@ -1,2 +1,3 @@
 from store.views.apis import *
+from store.views.async_apis import *
 from store.views.pages import *
@@ -1,35 +1,51 @@
+import time
 from http import HTTPStatus
 from typing import *
 
 from django.core.exceptions import ObjectDoesNotExist, ValidationError
 from django.db import IntegrityError
-from django.http import HttpRequest, HttpResponse, JsonResponse
+from django.http import HttpRequest, HttpResponse, StreamingHttpResponse
 from django.views.generic import View
 
+from store import metrics
+from store.caching import *
 from store.dto import *
+from store.events import OrderEvent, order_event_hub
 from store.exceptions import *
+from store.importing import import_products, iter_rows
+from store.mail import mail_queue
 from store.models import *
+from store.pagination import *
+from store.ratelimit import body_email, client_ip, rate_limited
+from store.responses import *
+from store.search import product_index
 from store.serializers import *
 
 # Create your views here.
 
 
-def check_user_logged_in(request):
-    """만약 로그인이 되어있지 않다면 UserNotLoggedInException 을 발생시킵니다."""
-    User.current_user(request)
+def check_user_logged_in(request) -> User:
+    """로그인한 사용자를 반환합니다.
+
+    만약 로그인이 되어있지 않다면 UserNotLoggedInException 을 발생시킵니다.
+    """
+    return User.current_user(request)
 
 
 class EmailValidationView(View):
+    @rate_limited('email-validation', [(client_ip, 10, 60 * 10), (body_email, 3, 60 * 10)])
     def post(self, request: HttpRequest) -> HttpResponse:
         """이메일 인증 기능을 수행합니다.
 
         반드시 인증할 이메일 주소를 요청 Body에 포함해야합니다.
         이메일 주소가 포함 되어있지 않다면 400 BadRequest 응답코드를 반환합니다.
+        메일은 발송 큐에 넣은 뒤 바로 응답하며, 실제 발송은 백그라운드에서 이루어집니다.
+        같은 IP 나 이메일 주소로 너무 자주 요청하면 429 Too Many Requests 응답코드를 반환합니다.
         """
         try:
             dto = EmailValidationRequestDTO.from_request(request)
             entity = EmailValidation.create_or_update_from_dto(dto)
-            entity.send_email()
+            mail_queue.enqueue(entity.create_email())
             return HttpResponse(status=HTTPStatus.OK)
         except (KeyError, ValueError):
             return HttpResponse(status=HTTPStatus.BAD_REQUEST)
@@ -46,7 +62,7 @@ class UserCreateView(View):
             if not is_valid:
                 raise ValidationError('이메일 인증 코드가 올바르지 않습니다.')
             user = User.create_from_dto(dto)
-            return JsonResponse(
+            return ApiJsonResponse(
                 status=HTTPStatus.CREATED,
                 data={
                     "message": "회원가입에 성공하였습니다.",
@@ -67,12 +83,13 @@ class UserCreateView(View):
 class UserLoginView(View):
     "/login"
 
+    @rate_limited('login', [(client_ip, 30, 60), (body_email, 10, 60 * 5)])
     def post(self, request: HttpRequest) -> HttpResponse:
         """사용자/로그인"""
         try:
             dto = UserLoginDTO.from_request(request)
             entity = User.authenticate(request, dto)
-            return JsonResponse(
+            return ApiJsonResponse(
                 status=HTTPStatus.MOVED_PERMANENTLY,
                 data={
                     "data": {
@@ -110,13 +127,26 @@ class OrderView(View):
         try:
             check_user_logged_in(request)
             dto = OrderQueryDTO.from_request(request)
+            page_dto = PageQueryDTO.from_request(request)
             entities = Order.query_from_dto(dto)
-            return JsonResponse(
+            if wants_stream(request) and not page_dto.is_paginated:
+                return StreamingJsonListResponse(
+                    'orders', entities, serializeOrders,
+                    status=HTTPStatus.OK,
+                    headers={
+                        'Access-Control-Allow-Origin': '*',
+                    },
+                )
+            data = {}
+            if page_dto.is_paginated:
+                page = paginate(entities, page_dto)
+                entities = page.entities
+                data['paging'] = page.serialize()
+            data['orders'] = serializeOrders(entities)
+            return ApiJsonResponse(
                 status=HTTPStatus.OK,
                 data={
-                    "data": {
-                        "orders": list(map(serializeOrder, entities)),
-                    }
+                    "data": data,
                 },
                 headers={
                     'Access-Control-Allow-Origin': '*',
@@ -132,7 +162,7 @@ class OrderView(View):
         try:
             dto = OrderCreationDTO.from_request(request)
             entity = Order.create_from_dto(dto)
-            return JsonResponse(
+            return ApiJsonResponse(
                 status=HTTPStatus.CREATED,
                 data={
                     "data": {
@@ -143,6 +173,8 @@ class OrderView(View):
                     'Access-Control-Allow-Origin': '*',
                 },
             )
+        except ObjectDoesNotExist:
+            return ApiJsonResponse(status=HTTPStatus.BAD_REQUEST, data={"message": "Product not found"})
         except (KeyError, ValueError):
             return HttpResponse(status=HTTPStatus.BAD_REQUEST)
 
@@ -153,12 +185,14 @@ class OrderIdView(View):
     def get(self, request: HttpRequest, order_id: int) -> HttpResponse:
         """주문/조회/단일 항목 조회"""
         try:
-            entity = Order.objects.get(pk=order_id)
-            return JsonResponse(
+            orders = serializeOrders(Order.objects.filter(pk=order_id))
+            if not orders:
+                raise Order.DoesNotExist()
+            return ApiJsonResponse(
                 status=HTTPStatus.OK,
                 data={
                     "data": {
-                        "order": serializeOrder(entity)
+                        "order": orders[0]
                     }
                 },
                 headers={
@@ -169,12 +203,16 @@ class OrderIdView(View):
             return HttpResponse(status=HTTPStatus.NOT_FOUND)
 
     def patch(self, request: HttpRequest, order_id: int) -> HttpResponse:
-        """주문/수정"""
+        """주문/수정
+
+        주문의 현재 상태에서 요청한 상태로 변경할 수 없다면 409 Conflict 응답코드를 반환합니다.
+        존재하지 않는 상태라면 주문/일괄 수정과 같이 400 Bad Request 응답코드를 반환합니다.
+        """
         try:
             check_user_logged_in(request)
             dto = OrderModificationDTO.from_request(request)
             entity = Order.update_from_dto(order_id, dto)
-            return JsonResponse(
+            return ApiJsonResponse(
                 status=HTTPStatus.OK,
                 data={
                     "data": {
@@ -187,36 +225,191 @@ class OrderIdView(View):
             )
         except (KeyError, ValueError):
             return HttpResponse(status=HTTPStatus.BAD_REQUEST)
+        except OrderStatus.DoesNotExist:
+            return ApiJsonResponse(status=HTTPStatus.BAD_REQUEST, data={"message": "Status not found"})
         except ObjectDoesNotExist:
             return HttpResponse(status=HTTPStatus.NOT_FOUND)
+        except OrderStatusConflictException:
+            return HttpResponse(status=HTTPStatus.CONFLICT)
+        except UserNotLoggedInException:
+            return HttpResponse(status=HTTPStatus.UNAUTHORIZED)
+
+
+class OrderBulkView(View):
+    "/order/bulk"
+
+    def patch(self, request: HttpRequest) -> HttpResponse:
+        """주문/일괄 수정
+
+        여러 주문(ids)의 상태(status)를 한 번에 변경하고, 주문 별 결과와 변경된 주문을 반환합니다.
+        """
+        try:
+            check_user_logged_in(request)
+            dto = OrderBulkModificationDTO.from_request(request)
+            results, entities = Order.bulk_update_from_dto(dto)
+            return ApiJsonResponse(
+                status=HTTPStatus.OK,
+                data={
+                    "data": {
+                        "results": [{"id": pk, "result": result} for pk, result in results.items()],
+                        "orders": serializeOrders(entities),
+                    }
+                },
+                headers={
+                    'Access-Control-Allow-Origin': '*',
+                },
+            )
+        except (KeyError, ValueError, TypeError):
+            return HttpResponse(status=HTTPStatus.BAD_REQUEST)
+        except ObjectDoesNotExist:
+            return ApiJsonResponse(status=HTTPStatus.BAD_REQUEST, data={"message": "Status not found"})
+        except UserNotLoggedInException:
+            return HttpResponse(status=HTTPStatus.UNAUTHORIZED)
+
+
+class OrderEventView(View):
+    "/order/events"
+
+    HEARTBEAT_SECONDS = 15
+    STREAM_SECONDS = 300
+    STREAM_HEADERS = {
+        'Access-Control-Allow-Origin': '*',
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no',
+    }
+
+    def get(self, request: HttpRequest) -> HttpResponse:
+        """주문/실시간 변경 알림 (Server-Sent Events)
+
+        새 주문(order-created)과 주문 상태 변경(order-updated)이 생길 때마다 직렬화된 주문을 보냅니다.
+        Last-Event-ID 헤더(또는 last-event-id 쿼리)를 보내면 그 이후의 이벤트부터 이어서 받습니다.
+        이어서 받을 수 없다면 reset 이벤트를 보내며, 이때 클라이언트는 주문 목록을 다시 조회해야 합니다.
+        STREAM_SECONDS 초 후에 연결을 닫으며, 브라우저는 자동으로 재접속합니다.
+
+        mode=poll 이면 롱 폴링으로 동작하여, 이벤트가 생기거나 HEARTBEAT_SECONDS 초가 지나면 JSON 으로 응답합니다.
+        WSGI 에서는 연결된 주문 화면마다 스레드 하나를 계속 사용하므로, 화면 수보다 많은 스레드가 필요합니다.
+        ASGI 에서는 스레드를 붙잡지 않는 async_order_event_view 로 제공됩니다.
+        """
+        try:
+            check_user_logged_in(request)
+            last_id = self.last_event_id(request)
+        except ValueError:
+            return HttpResponse(status=HTTPStatus.BAD_REQUEST)
         except UserNotLoggedInException:
             return HttpResponse(status=HTTPStatus.UNAUTHORIZED)
+        if request.GET.get('mode') == 'poll':
+            events = order_event_hub.wait(last_id, timeout=self.HEARTBEAT_SECONDS)
+            return self.poll_response(last_id, events)
+        return StreamingHttpResponse(
+            self.stream(last_id),
+            status=HTTPStatus.OK,
+            content_type='text/event-stream',
+            headers=self.STREAM_HEADERS,
+        )
+
+    @staticmethod
+    def last_event_id(request: HttpRequest) -> int:
+        """마지막으로 받은 이벤트의 id. 보내지 않았다면 지금까지 발행된 마지막 id 를 반환합니다.
+
+        :raises ValueError: id 가 정수가 아닌 경우에 발생.
+        """
+        last_id = request.headers.get('Last-Event-ID', request.GET.get('last-event-id'))
+        return order_event_hub.last_id if last_id is None else int(last_id)
+
+    @staticmethod
+    def poll_response(last_id: int, events: Optional[List[OrderEvent]]) -> HttpResponse:
+        if events is None:
+            last_id = order_event_hub.last_id
+        elif events:
+            last_id = events[-1].id
+        return ApiJsonResponse(
+            status=HTTPStatus.OK,
+            data={
+                "data": {
+                    "reset": events is None,
+                    "last_event_id": last_id,
+                    "events": [
+                        {"id": event.id, "type": event.type, "order": event.data}
+                        for event in events or []
+                    ],
+                },
+            },
+            headers={
+                'Access-Control-Allow-Origin': '*',
+            },
+        )
+
+    @staticmethod
+    def messages(last_id: int, events: Optional[List[OrderEvent]]) -> Tuple[List[str], int]:
+        """기다린 결과를 보낼 SSE 메시지 목록과 다음에 기다릴 id 로 바꿉니다."""
+        if events is None:
+            last_id = order_event_hub.last_id
+            return [f'id: {last_id}\nevent: reset\ndata: {{}}\n\n'], last_id
+        if not events:
+            return [': keep-alive\n\n'], last_id
+        return [event.to_sse() for event in events], events[-1].id
+
+    def stream(self, last_id: int) -> Iterator[str]:
+        yield 'retry: 3000\n\n'
+        deadline = time.monotonic() + self.STREAM_SECONDS
+        while time.monotonic() < deadline:
+            events = order_event_hub.wait(last_id, timeout=self.HEARTBEAT_SECONDS)
+            messages, last_id = self.messages(last_id, events)
+            yield from messages
+
+    @classmethod
+    async def stream_async(cls, last_id: int) -> AsyncIterator[str]:
+        yield 'retry: 3000\n\n'
+        deadline = time.monotonic() + cls.STREAM_SECONDS
+        while time.monotonic() < deadline:
+            events = await order_event_hub.wait_async(last_id, timeout=cls.HEARTBEAT_SECONDS)
+            messages, last_id = cls.messages(last_id, events)
+            for message in messages:
+                yield message
 
 
 class ProductView(View):
     "/product"
 
+    @catalog_cached(lambda request: (
+        ProductQueryDTO.from_request(request),
+        PageQueryDTO.from_request(request),
+        wants_stream(request),
+    ))
     def get(self, request: HttpRequest) -> HttpResponse:
         """상품/조회/여러 항목 조회"""
-        # TODO: pagination 기능 추가
         try:
             dto = ProductQueryDTO.from_request(request)
+            page_dto = PageQueryDTO.from_request(request)
             entities = Product.query_from_dto(dto)
-            return JsonResponse(
+            if wants_stream(request) and not page_dto.is_paginated:
+                return StreamingJsonListResponse(
+                    'products', entities,
+                    lambda chunk: list(map(serializeProduct, chunk)),
+                    status=HTTPStatus.OK,
+                    headers={
+                        'Access-Control-Allow-Origin': '*',
+                    },
+                )
+            data = {}
+            if page_dto.is_paginated:
+                page = paginate(entities, page_dto)
+                entities = page.entities
+                data['paging'] = page.serialize()
+            data['products'] = list(map(serializeProduct, entities))
+            return ApiJsonResponse(
                 status=HTTPStatus.OK,
                 data={
-                    "data": {
-                        "products": list(map(serializeProduct, entities)),
-                    },
+                    "data": data,
                 },
                 headers={
                     'Access-Control-Allow-Origin': '*',
                 },
             )
         except ObjectDoesNotExist:
-            return JsonResponse(status=HTTPStatus.BAD_REQUEST, data={"message": "Category not found"})
+            return ApiJsonResponse(status=HTTPStatus.BAD_REQUEST, data={"message": "Category not found"})
         except (KeyError, ValueError):
-            return JsonResponse(status=HTTPStatus.BAD_REQUEST, data={})
+            return ApiJsonResponse(status=HTTPStatus.BAD_REQUEST, data={})
 
     def post(self, request: HttpRequest) -> HttpResponse:
         """상품/추가"""
@@ -224,7 +417,7 @@ class ProductView(View):
             check_user_logged_in(request)
             dto = ProductCreationDTO.from_request(request)
             entity = Product.create_from_dto(dto)
-            return JsonResponse(
+            return ApiJsonResponse(
                 status=HTTPStatus.CREATED,
                 data={
                     "data": {
@@ -233,13 +426,73 @@ class ProductView(View):
                 }
             )
         except ObjectDoesNotExist:
-            return JsonResponse(status=HTTPStatus.BAD_REQUEST, data={"message": "Category not found"})
+            return ApiJsonResponse(status=HTTPStatus.BAD_REQUEST, data={"message": "Category not found"})
         except (KeyError, ValueError):
-            return JsonResponse(status=HTTPStatus.BAD_REQUEST, data={})
+            return ApiJsonResponse(status=HTTPStatus.BAD_REQUEST, data={})
         except IntegrityError:
-            return JsonResponse(status=HTTPStatus.CONFLICT, data={})
+            return ApiJsonResponse(status=HTTPStatus.CONFLICT, data={})
+        except UserNotLoggedInException:
+            return HttpResponse(status=HTTPStatus.UNAUTHORIZED)
+
+
+class ProductBulkView(View):
+    "/product/bulk"
+
+    def post(self, request: HttpRequest) -> HttpResponse:
+        """상품/일괄 추가 및 수정
+
+        요청 Body 는 한 줄에 상품 하나인 JSON Lines 이며, Content-Type 이 text/csv 라면 첫 줄이 머리글인 CSV 입니다.
+        각 행의 속성은 상품/추가와 같고, id 가 있는 행은 해당 상품을 수정합니다.
+        Body 는 한 번에 메모리에 올리지 않고 읽으면서 저장하며, 잘못된 행은 건너뛰고 errors 에 줄 번호와 함께 반환합니다.
+        Body 가 UTF-8 이 아니라면 400을 반환합니다. 이때 앞서 저장된 행은 그대로 남습니다.
+        """
+        try:
+            check_user_logged_in(request)
+            format = 'csv' if request.content_type == 'text/csv' else 'jsonl'
+            result = import_products(iter_rows(request, format))
+            return ApiJsonResponse(
+                status=HTTPStatus.OK,
+                data={
+                    "data": {
+                        "created": result.created,
+                        "updated": result.updated,
+                        "errors": result.errors,
+                    },
+                },
+                headers={
+                    'Access-Control-Allow-Origin': '*',
+                },
+            )
         except UserNotLoggedInException:
             return HttpResponse(status=HTTPStatus.UNAUTHORIZED)
+        except UnicodeDecodeError:
+            return HttpResponse(status=HTTPStatus.BAD_REQUEST)
+
+
+class ProductSearchView(View):
+    "/product/search"
+
+    def get(self, request: HttpRequest) -> HttpResponse:
+        """상품/검색
+
+        이름에 검색어가 포함된 상품을 반환합니다. 초성(예: 'ㅇㅁㄹ')으로도 검색할 수 있습니다.
+        데이터베이스 대신 프로세스 메모리의 색인을 사용합니다.
+        """
+        try:
+            dto = ProductSearchDTO.from_request(request)
+            return ApiJsonResponse(
+                status=HTTPStatus.OK,
+                data={
+                    "data": {
+                        "products": product_index.search(dto.query, dto.limit),
+                    },
+                },
+                headers={
+                    'Access-Control-Allow-Origin': '*',
+                },
+            )
+        except (KeyError, ValueError):
+            return ApiJsonResponse(status=HTTPStatus.BAD_REQUEST, data={})
 
 
 class ProductIdView(View):
@@ -251,7 +504,7 @@ class ProductIdView(View):
             check_user_logged_in(request)
             dto = ProductModificationDTO.from_request(request)
             entity = Product.update_from_dto(product_id, dto)
-            return JsonResponse(
+            return ApiJsonResponse(
                 status=HTTPStatus.OK,
                   data={
                     "data": {
@@ -263,11 +516,11 @@ class ProductIdView(View):
                 },
             )
         except ObjectDoesNotExist:
-            return JsonResponse(status=HTTPStatus.NOT_FOUND, data={})
+            return ApiJsonResponse(status=HTTPStatus.NOT_FOUND, data={})
         except (KeyError, ValueError):
-            return JsonResponse(status=HTTPStatus.BAD_REQUEST, data={})
+            return ApiJsonResponse(status=HTTPStatus.BAD_REQUEST, data={})
         except IntegrityError:
-            return JsonResponse(status=HTTPStatus.CONFLICT, data={})
+            return ApiJsonResponse(status=HTTPStatus.CONFLICT, data={})
         except UserNotLoggedInException:
             return HttpResponse(status=HTTPStatus.UNAUTHORIZED)
 
@@ -275,10 +528,20 @@ class ProductIdView(View):
 class CategoryView(View):
     "/category"
 
+    @catalog_cached(lambda request: wants_stream(request))
     def get(self, request: HttpRequest) -> HttpResponse:
         """카테고리/조회"""
         categories = Category.objects.all()
-        return JsonResponse(
+        if wants_stream(request):
+            return StreamingJsonListResponse(
+                'categories', categories,
+                lambda chunk: list(map(serializeCategory, chunk)),
+                status=HTTPStatus.OK,
+                headers={
+                    'Access-Control-Allow-Origin': '*',
+                },
+            )
+        return ApiJsonResponse(
             status=HTTPStatus.OK,
             data={
                 "data": {
@@ -289,3 +552,58 @@ class CategoryView(View):
                 'Access-Control-Allow-Origin': '*',
             },
         )
+
+
+class SalesView(View):
+    "/sales"
+
+    def get(self, request: HttpRequest) -> HttpResponse:
+        """매출/조회
+
+        집계 테이블만 읽으므로 주문 내역의 크기와 관계없이 일정한 시간에 응답합니다.
+        """
+        try:
+            check_user_logged_in(request)
+            dto = SalesQueryDTO.from_request(request)
+            product_rollups = ProductSalesRollup.query_from_dto(dto)
+            return ApiJsonResponse(
+                status=HTTPStatus.OK,
+                data={
+                    "data": {
+                        "sales": list(map(serializeSalesRollup, SalesRollup.query_from_dto(dto))),
+                        "products": [
+                            serializeSalesSummary(row, 'product')
+                            for row in ProductSalesRollup.summarize(product_rollups, 'product')
+                        ],
+                        "categories": [
+                            serializeSalesSummary(row, 'category')
+                            for row in ProductSalesRollup.summarize(product_rollups, 'category')
+                        ],
+                    },
+                },
+                headers={
+                    'Access-Control-Allow-Origin': '*',
+                },
+            )
+        except ValueError:
+            return HttpResponse(status=HTTPStatus.BAD_REQUEST)
+        except UserNotLoggedInException:
+            return HttpResponse(status=HTTPStatus.UNAUTHORIZED)
+
+
+class MetricsView(View):
+    "/metrics"
+
+    def get(self, request: HttpRequest) -> HttpResponse:
+        """메트릭/수집
+
+        Prometheus 가 수집할 수 있는 text exposition format 으로 메트릭을 반환합니다.
+        settings.STORE_METRICS_ALLOWED_IPS 에 없는 주소에서 요청하면 403 Forbidden 응답코드를 반환합니다.
+        """
+        if not metrics.is_scrape_allowed(client_ip(request)):
+            return HttpResponse(status=HTTPStatus.FORBIDDEN)
+        return HttpResponse(
+            metrics.registry.render(),
+            status=HTTPStatus.OK,
+            content_type='text/plain; version=0.0.4; charset=utf-8',
+        )
@@ -0,0 +1,87 @@
+import contextlib
+import functools
+from http import HTTPStatus
+from typing import *
+
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections
+from django.http import HttpRequest, HttpResponse, HttpResponseNotAllowed
+from django.views.generic import View
+
+from store.events import order_event_hub
+from store.exceptions import *
+from store.responses import AsyncStreamingHttpResponse
+from store.views.apis import OrderEventView, check_user_logged_in
+
+
+def database_sync_to_async(func: Callable) -> Callable:
+    """데이터베이스를 사용하는 동기 함수를 스레드 풀에서 실행하는 코루틴 함수로 만듭니다.
+
+    요청이 하나의 공유 스레드에서 차례로 실행되지 않도록 thread_sensitive=False 로 실행하며,
+    스레드마다 데이터베이스 연결이 생기므로 WSGI 의 요청 시작/종료처럼 앞뒤로 오래된 연결을 정리합니다.
+    """
+    @functools.wraps(func)
+    def run(*args, **kwargs):
+        close_old_connections()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            close_old_connections()
+
+    return sync_to_async(run, thread_sensitive=False)
+
+
+def async_api_view(view_class: Type[View], **initkwargs) -> Callable:
+    """API View 를 ASGI 서버에서 실행할 비동기 함수 View 로 만듭니다.
+
+    Django 3.2 에는 비동기 ORM 과 비동기 클래스 기반 View 가 없으므로,
+    요청 하나의 데이터베이스 작업 전체를 한 번의 database_sync_to_async 호출로 실행합니다.
+    그동안 이벤트 루프는 다른 요청을 처리할 수 있으며, 인증 메일은 발송 큐에 넣기만 하므로 기다리지 않습니다.
+
+    스트리밍 응답은 이벤트 루프에서 데이터베이스를 조회할 수 없으므로 같은 스레드에서 내용을 모두 만든 뒤 반환합니다.
+    QueryAccountingMiddleware 가 측정 중인 요청(request.query_stats)이라면 그 스레드의 쿼리를 기록합니다.
+    """
+    view_func = view_class.as_view(**initkwargs)
+
+    @database_sync_to_async
+    def sync_view(request: HttpRequest, *args, **kwargs) -> HttpResponse:
+        stats = getattr(request, 'query_stats', None)
+        with stats.track() if stats is not None else contextlib.nullcontext():
+            response = view_func(request, *args, **kwargs)
+            if response.streaming:
+                response.streaming_content = list(response.streaming_content)
+        return response
+
+    async def view(request: HttpRequest, *args, **kwargs) -> HttpResponse:
+        return await sync_view(request, *args, **kwargs)
+
+    view.view_class = view_class
+    view.view_initkwargs = initkwargs
+    view.csrf_exempt = True
+    return view
+
+
+async def async_order_event_view(request: HttpRequest) -> HttpResponse:
+    """주문/실시간 변경 알림의 비동기 View. 동작은 OrderEventView 와 같습니다.
+
+    이벤트를 이벤트 루프에서 기다리므로 연결된 주문 화면의 수와 관계없이 스레드를 사용하지 않습니다.
+    스트림은 AsyncStreamingHttpResponse 이므로 store.asgi.ASGIHandler 로 구동해야 합니다.
+    """
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    try:
+        await database_sync_to_async(check_user_logged_in)(request)
+        last_id = OrderEventView.last_event_id(request)
+    except ValueError:
+        return HttpResponse(status=HTTPStatus.BAD_REQUEST)
+    except UserNotLoggedInException:
+        return HttpResponse(status=HTTPStatus.UNAUTHORIZED)
+    if request.GET.get('mode') == 'poll':
+        events = await order_event_hub.wait_async(last_id, timeout=OrderEventView.HEARTBEAT_SECONDS)
+        return OrderEventView.poll_response(last_id, events)
+    return AsyncStreamingHttpResponse(
+        OrderEventView.stream_async(last_id),
+        status=HTTPStatus.OK,
+        content_type='text/event-stream',
+        headers=OrderEventView.STREAM_HEADERS,
+    )
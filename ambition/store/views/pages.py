@@ -22,5 +22,5 @@ class RequireLoginTemplateView(TemplateView):
     """
     def get_context_data(self, **kwargs: Any) -> Dict[str, Any]:
         context = super().get_context_data(**kwargs)
-        context['user'] = serializeUser(User.current_user(self.request))
+        context['user'] = serializeUser(self.request.store_user)
         return context